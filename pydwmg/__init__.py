@@ -0,0 +1,53 @@
+"""Dude, Where's My Guild - EverQuest log based mapping.
+
+The top level package is pure Python and never imports Qt, so the log
+reading, event classification, zone registry and coordinate math can be
+used from tools, benchmarks and headless services. The Qt window lives in
+the pydwmg.gui subpackage.
+"""
+
+from pydwmg.events import (
+    HEADER_LENGTH,
+    HEADING_PATTERN,
+    LOC_PATTERN,
+    WHO_PATTERN,
+    ZONE_PATTERN,
+    Event,
+    classify_line,
+    parse_timestamp,
+)
+from pydwmg.geometry import (
+    arrow_lines,
+    clamp_to_map,
+    d_to_r,
+    eq_to_map,
+    heading_vector,
+    rotate_point,
+    rotation,
+)
+from pydwmg.logfile import LogTailer, find_starting_zone, reverse_readline
+from pydwmg.zones import Zone, find_zone, load_zones
+
+__all__ = [
+    "HEADER_LENGTH",
+    "HEADING_PATTERN",
+    "LOC_PATTERN",
+    "WHO_PATTERN",
+    "ZONE_PATTERN",
+    "Event",
+    "classify_line",
+    "parse_timestamp",
+    "arrow_lines",
+    "clamp_to_map",
+    "d_to_r",
+    "eq_to_map",
+    "heading_vector",
+    "rotate_point",
+    "rotation",
+    "LogTailer",
+    "find_starting_zone",
+    "reverse_readline",
+    "Zone",
+    "find_zone",
+    "load_zones",
+]
@@ -0,0 +1,5 @@
+import sys
+
+from pydwmg.cli import main
+
+sys.exit(main())
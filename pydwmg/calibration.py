@@ -0,0 +1,136 @@
+"""Fitting zone map scale and offsets to loc and map pixel control points.
+
+A map pixel is a fixed scale and offset away from an EQ loc, see
+geometry.eq_to_map:
+
+    map_x = -x * s + offset_x
+    map_y = -y * s + offset_y
+
+where s is map_grid_size / eq_grid_size. With control points pairing
+locs with the map pixel they belong at, s, offset_x and offset_y are the
+linear least squares solution of those equations for every point. Points
+far off the first fit, such as a misplaced click, are dropped and the fit
+repeated.
+
+Control point files have one point per line in the columns of
+CONTROL_POINT_HEADER, with locs in /loc order (y before x) as they are
+printed in the log.
+"""
+
+import csv
+from collections import namedtuple
+
+import numpy as np
+
+CONTROL_POINT_HEADER = ["zone_name", "loc_y", "loc_x", "map_x", "map_y"]
+
+# Points further than this many times the median residual from a fit, and
+# at least MIN_OUTLIER_PIXELS away, are treated as outliers.
+OUTLIER_FACTOR = 4.0
+MIN_OUTLIER_PIXELS = 2.0
+OUTLIER_PASSES = 2
+# A fit needs points this far apart in EQ units to fix the scale.
+MIN_SPREAD = 100.0
+
+Fit = namedtuple(
+    "Fit",
+    [
+        "zone_name",
+        "scale",
+        "offset_x",
+        "offset_y",
+        "points",
+        "used",
+        "rms",
+        "max_error",
+        "error",
+    ],
+)
+Fit.__doc__ = """Result of calibrating one zone, error says why a fit failed."""
+
+
+def read_control_points(filenames):
+    """Return a dict of zone name to (locs, pixels) arrays from control files.
+
+    locs are (x, y) in map order and pixels (map_x, map_y), one row each
+    per control point.
+    """
+    rows = {}
+    for filename in filenames:
+        with open(filename, newline="") as f:
+            reader = csv.reader(f)
+            next(reader)  # Skip first line
+            for row in reader:
+                if not row:
+                    continue
+                zone_name, loc_y, loc_x, map_x, map_y = row
+                rows.setdefault(zone_name, []).append(
+                    (float(loc_x), float(loc_y), float(map_x), float(map_y))
+                )
+    points = {}
+    for zone_name, zone_rows in rows.items():
+        values = np.array(zone_rows)
+        points[zone_name] = (values[:, :2], values[:, 2:])
+    return points
+
+
+def solve(locs, pixels):
+    """Return (scale, offset_x, offset_y) best mapping locs to pixels."""
+    count = len(locs)
+    # Rows for map_x then map_y, columns for s, offset_x and offset_y.
+    a = np.zeros((2 * count, 3))
+    a[:count, 0] = -locs[:, 0]
+    a[:count, 1] = 1
+    a[count:, 0] = -locs[:, 1]
+    a[count:, 2] = 1
+    b = np.concatenate([pixels[:, 0], pixels[:, 1]])
+    solution, _, _, _ = np.linalg.lstsq(a, b, rcond=None)
+    return tuple(solution)
+
+
+def residuals(locs, pixels, scale, offset_x, offset_y):
+    """Return the pixel distance of each point from where the fit puts it."""
+    predicted_x = -locs[:, 0] * scale + offset_x
+    predicted_y = -locs[:, 1] * scale + offset_y
+    return np.hypot(predicted_x - pixels[:, 0], predicted_y - pixels[:, 1])
+
+
+def fit_zone(zone_name, locs, pixels):
+    """Return a Fit of scale and offsets for one zone's control points."""
+    points = len(locs)
+    spread = np.ptp(locs, axis=0).max() if points else 0.0
+    if points < 2 or spread < MIN_SPREAD:
+        error = f"needs 2 or more points at least {MIN_SPREAD:g} units apart"
+        return Fit(zone_name, None, None, None, points, 0, None, None, error)
+    keep = np.ones(points, dtype=bool)
+    for _ in range(OUTLIER_PASSES + 1):
+        scale, offset_x, offset_y = solve(locs[keep], pixels[keep])
+        errors = residuals(locs, pixels, scale, offset_x, offset_y)
+        limit = max(OUTLIER_FACTOR * np.median(errors[keep]), MIN_OUTLIER_PIXELS)
+        new_keep = errors <= limit
+        # Only drop outliers while enough points remain to fit.
+        if new_keep.sum() < max(2, points // 2) or (new_keep == keep).all():
+            break
+        keep = new_keep
+    errors = residuals(locs[keep], pixels[keep], scale, offset_x, offset_y)
+    error = None
+    if scale <= 0:
+        error = "fitted scale is not positive, check the control points"
+    return Fit(
+        zone_name,
+        scale,
+        offset_x,
+        offset_y,
+        points,
+        int(keep.sum()),
+        float(np.sqrt(np.mean(errors ** 2))),
+        float(errors.max()),
+        error,
+    )
+
+
+def zone_residuals(zone, locs, pixels):
+    """Return control point pixel errors for a Zone's current calibration."""
+    return residuals(
+        locs, pixels, 1 / zone.map_scale_factor, zone.offset_x, zone.offset_y
+    )
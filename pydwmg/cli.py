@@ -0,0 +1,143 @@
+"""Console entry point for PyDWMG.
+
+Running without a command starts the map window. The other commands only
+use the pure Python core and never import Qt.
+"""
+
+import argparse
+import asyncio
+import logging
+import sys
+import time
+
+from pydwmg.events import classify_line
+from pydwmg.logfile import LogTailer, find_starting_zone
+from pydwmg.polling import PollSchedule
+from pydwmg.service import DEFAULT_HOST, DEFAULT_PORT, TrackingService
+from pydwmg.tracing import setup_logging, tracer
+
+logger = logging.getLogger(__name__)
+
+LOG_LEVELS = ("debug", "info", "warning", "error")
+
+
+def cmd_gui(args):
+    """Start the Qt map window."""
+    # Imported here so headless commands work without PyQt5 installed.
+    from pydwmg.gui import run
+
+    return run()
+
+
+def cmd_tail(args):
+    """Follow a log file and print each zone and loc event as it arrives."""
+    starting_zone = find_starting_zone(args.logfile)
+    if starting_zone is not None:
+        print(f"zone\t{starting_zone}", flush=True)
+    schedule = PollSchedule(args.interval, args.max_interval, name="tail")
+    with LogTailer(args.logfile) as tailer:
+        try:
+            while True:
+                lines = tailer.readlines()
+                if not lines:
+                    time.sleep(schedule.next_interval())
+                    continue
+                schedule.activity()
+                for line in lines:
+                    event = classify_line(line)
+                    if event is not None:
+                        print(
+                            f"{event.time:.0f}\t{event.kind}\t{event.value}",
+                            flush=True,
+                        )
+        except KeyboardInterrupt:
+            pass
+    return 0
+
+
+def cmd_serve(args):
+    """Publish events from log files to socket subscribers until interrupted."""
+    service = TrackingService(
+        args.logfiles, poll_interval=args.interval, max_queue=args.max_queue
+    )
+    try:
+        asyncio.run(service.serve_forever(args.host, args.port, args.unix))
+    except FileNotFoundError as error:
+        logger.error("%s", error)
+        return 1
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="pydwmg", description="Dude, Where's My Guild - EverQuest mapping"
+    )
+    parser.add_argument(
+        "--log-level", choices=LOG_LEVELS, default="info", help="least severe logged"
+    )
+    parser.add_argument(
+        "--trace",
+        metavar="FILE",
+        help="time parsing, zone switches and drawing, saved as Chrome trace JSON",
+    )
+    subparsers = parser.add_subparsers(dest="command")
+
+    gui_parser = subparsers.add_parser("gui", help="start the map window (default)")
+    gui_parser.set_defaults(func=cmd_gui)
+
+    tail_parser = subparsers.add_parser(
+        "tail", help="print zone and loc events from a log file without a window"
+    )
+    tail_parser.add_argument("logfile", help="EQ log file to follow")
+    tail_parser.add_argument(
+        "--interval", type=float, default=0.1, help="poll interval in seconds"
+    )
+    tail_parser.add_argument(
+        "--max-interval",
+        type=float,
+        default=1.0,
+        help="longest poll interval in seconds while the log is quiet",
+    )
+    tail_parser.set_defaults(func=cmd_tail)
+
+    serve_parser = subparsers.add_parser(
+        "serve", help="publish log events as newline delimited JSON over a socket"
+    )
+    serve_parser.add_argument("logfiles", nargs="+", help="EQ log files to follow")
+    serve_parser.add_argument("--host", default=DEFAULT_HOST)
+    serve_parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    serve_parser.add_argument(
+        "--unix", metavar="PATH", help="listen on a Unix socket instead of TCP"
+    )
+    serve_parser.add_argument(
+        "--interval", type=float, default=0.1, help="poll interval in seconds"
+    )
+    serve_parser.add_argument(
+        "--max-queue",
+        type=int,
+        default=1000,
+        help="zone/who frames a subscriber may fall behind before it is dropped",
+    )
+    serve_parser.set_defaults(func=cmd_serve)
+
+    parser.set_defaults(func=cmd_gui)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    setup_logging(args.log_level.upper())
+    if args.trace:
+        tracer.enable()
+    try:
+        return args.func(args)
+    finally:
+        if args.trace:
+            spans = tracer.export_chrome_trace(args.trace)
+            logger.info("Saved %d trace spans to %s", spans, args.trace)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
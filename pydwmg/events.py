@@ -0,0 +1,151 @@
+"""Classification of EQ log lines into timestamped mapping events.
+
+Every EQ log line starts with a fixed width header such as
+"[Mon Jan 11 22:11:53 2021] ". The header is decoded by slicing rather
+than by regex or strptime, and the message after it is matched with
+patterns anchored at the end of the header.
+"""
+
+import re
+import time
+from collections import namedtuple
+
+# Length of the "[Mon Jan 11 22:11:53 2021] " header.
+HEADER_LENGTH = 27
+
+# Define regex patterns to use for log line matching, these are matched
+# against the message after the header.
+ZONE_PATTERN = re.compile(r"You have entered ([\w\s']+)\.$")
+LOC_PATTERN = re.compile(
+    r"Your Location is (\-?\d+\.\d+), (\-?\d+\.\d+), (\-?\d+\.\d+)$"
+)
+HEADING_PATTERN = re.compile(r"You think you are heading (\w+)\.$")
+WHO_PATTERN = re.compile(
+    r"\[(?:(\d+) ([\w ]+)|ANONYMOUS)\] (\w+)(?: \([\w ]+\))?\s*(?:<(.+)>)?$"
+)
+
+ZONE = "zone"
+LOC = "loc"
+WHO = "who"
+HEADING = "heading"
+
+MONTHS = {
+    "Jan": 1,
+    "Feb": 2,
+    "Mar": 3,
+    "Apr": 4,
+    "May": 5,
+    "Jun": 6,
+    "Jul": 7,
+    "Aug": 8,
+    "Sep": 9,
+    "Oct": 10,
+    "Nov": 11,
+    "Dec": 12,
+}
+
+# Decoded header times by second, logs repeat the same second many times
+# over so this saves nearly every conversion. A miss only needs the start
+# of the hour, which is cached separately and is correct across daylight
+# saving changes as they happen on the hour. Both are cleared when full.
+_timestamp_cache = {}
+_hour_cache = {}
+TIMESTAMP_CACHE_SIZE = 4096
+
+Event = namedtuple("Event", ["time", "kind", "value"])
+Event.__doc__ = """A classified log line, time is the header as epoch seconds."""
+
+
+def parse_timestamp(line):
+    """Return the local time header of a log line as epoch seconds, or None."""
+    if line[:1] != "[" or line[25:26] != "]":
+        return None
+    key = line[1:25]
+    try:
+        return _timestamp_cache[key]
+    except KeyError:
+        pass
+    try:
+        timestamp = _hour_start(line) + int(line[15:17]) * 60 + int(line[18:20])
+    except (KeyError, ValueError, OverflowError):
+        return None
+    if len(_timestamp_cache) >= TIMESTAMP_CACHE_SIZE:
+        _timestamp_cache.clear()
+    _timestamp_cache[key] = timestamp
+    return timestamp
+
+
+def _hour_start(line):
+    """Return the epoch time of the start of the hour in a log line header."""
+    key = line[5:14] + line[21:25]
+    try:
+        return _hour_cache[key]
+    except KeyError:
+        pass
+    hour_start = time.mktime(
+        (
+            int(line[21:25]),
+            MONTHS[line[5:8]],
+            int(line[9:11]),
+            int(line[12:14]),
+            0,
+            0,
+            0,
+            0,
+            -1,
+        )
+    )
+    if len(_hour_cache) >= TIMESTAMP_CACHE_SIZE:
+        _hour_cache.clear()
+    _hour_cache[key] = hour_start
+    return hour_start
+
+
+def _loc_value(match):
+    # EQ swaps x and y in its loc printout
+    y, x, z = match.groups()
+    return (float(x), float(y), float(z))
+
+
+def _who_value(match):
+    level, class_name, name, guild = match.groups()
+    if level is not None:
+        level = int(level)
+    return (name, level, class_name, guild)
+
+
+# Message starts, all MESSAGE_PREFIX_LENGTH long, and how to classify them.
+MESSAGE_PREFIX_LENGTH = 17
+_MESSAGE_PREFIXES = {
+    "Your Location is ": (LOC, LOC_PATTERN, _loc_value),
+    "You have entered ": (ZONE, ZONE_PATTERN, lambda match: match.group(1)),
+    "You think you are": (HEADING, HEADING_PATTERN, lambda match: match.group(1)),
+}
+_WHO_CLASSIFIER = (WHO, WHO_PATTERN, _who_value)
+
+
+def classify_line(line):
+    """Return an Event for a mapping log line, or None.
+
+    Zone events carry the zone name, loc events carry an (x, y, z) tuple of
+    floats in map order. Heading events carry the compass direction name
+    from a sense heading skill check. Who events carry a (name, level,
+    class, guild) tuple from a /who listing, with None for anything hidden
+    by anonymous.
+    """
+    # Pick the pattern from the start of the message before matching.
+    classifier = _MESSAGE_PREFIXES.get(
+        line[HEADER_LENGTH : HEADER_LENGTH + MESSAGE_PREFIX_LENGTH]
+    )
+    if classifier is None:
+        if line[HEADER_LENGTH : HEADER_LENGTH + 1] != "[":
+            return None
+        classifier = _WHO_CLASSIFIER
+    kind, pattern, value = classifier
+    match = pattern.match(line.rstrip("\r\n"), HEADER_LENGTH)
+    if match is None:
+        return None
+    timestamp = parse_timestamp(line)
+    if timestamp is None:
+        return None
+    return Event(timestamp, kind, value(match))
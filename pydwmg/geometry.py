@@ -0,0 +1,137 @@
+"""Coordinate transforms between EQ locs and map image pixels."""
+
+import functools
+import math
+
+
+def d_to_r(angle):
+    """Return the radian equivalent of degrees."""
+    return angle / 180 * math.pi
+
+
+@functools.lru_cache(maxsize=None)
+def rotation(degrees):
+    """Return the (cos, sin) terms of the rotation matrix for an angle."""
+    radians = d_to_r(degrees)
+    return (math.cos(radians), math.sin(radians))
+
+
+def rotate_point(end_x, end_y, start_x, start_y, degrees):
+    """Return a point after rotating it given end, start, and degrees."""
+    cos_angle, sin_angle = rotation(degrees)
+    rotated_x = start_x + (
+        cos_angle * (end_x - start_x) - sin_angle * (end_y - start_y)
+    )
+    rotated_y = start_y + (
+        sin_angle * (end_x - start_x) + cos_angle * (end_y - start_y)
+    )
+    return (rotated_x, rotated_y)
+
+
+def heading_vector(start_point, end_point):
+    """Return the unit vector of travel from start to end, or None if equal."""
+    x_vec = end_point[0] - start_point[0]
+    y_vec = end_point[1] - start_point[1]
+    mag = math.hypot(x_vec, y_vec)
+    if mag == 0:
+        return None
+    return (x_vec / mag, y_vec / mag)
+
+
+def eq_to_map(zone, x, y):
+    """Scale an EQ loc to map pixels using the zone scale factor and offsets."""
+    map_x = -x / zone.map_scale_factor + zone.offset_x
+    map_y = -y / zone.map_scale_factor + zone.offset_y
+    return (map_x, map_y)
+
+
+def clamp_to_map(new_point, prev_point, map_width, map_height, marker_size):
+    """Move a point outside the map onto a marker centred at the closest edge.
+
+    The same shift is applied to prev_point (which may be None) so the
+    movement vector between them stays accurate. Returns the adjusted
+    (new_point, prev_point) pair.
+    """
+    new_x, new_y = new_point
+    if prev_point is not None:
+        prev_x, prev_y = prev_point
+    # Set x to the center of a circle at the map edge, and make the
+    # same adjustment to prev loc to maintain accurate movement vector.
+    if new_x < 0:
+        if prev_point is not None:
+            x_shift = new_x
+            prev_x -= x_shift - marker_size / 2
+        new_x = marker_size / 2
+    elif new_x > map_width:
+        if prev_point is not None:
+            x_shift = new_x - map_width
+            prev_x -= x_shift + marker_size / 2
+        new_x = map_width - marker_size / 2
+    if new_y < 0:
+        if prev_point is not None:
+            y_shift = new_y
+            prev_y -= y_shift - marker_size / 2
+        new_y = marker_size / 2
+    elif new_y > map_height:
+        if prev_point is not None:
+            y_shift = new_y - map_height
+            prev_y -= y_shift + marker_size / 2
+        new_y = map_height - marker_size / 2
+    if prev_point is not None:
+        prev_point = (prev_x, prev_y)
+    return (new_x, new_y), prev_point
+
+
+def arrow_lines(start_point, end_point, size, draw_x=True):
+    """Return the line segments of a direction arrow ending at end_point.
+
+    Returns (arrow_head, cross) where each is a list of (x1, y1, x2, y2)
+    integer tuples. The cross marks the spot and is empty unless draw_x.
+    """
+    start_x, start_y = start_point
+    end_x, end_y = end_point
+
+    # Calculate heading vectors.
+    x_vec = start_x - end_x
+    y_vec = start_y - end_y
+
+    # Calculate magnitude (length) of vector.
+    mag = math.sqrt((x_vec ** 2) + (y_vec ** 2))
+
+    # Calculate unit vectors.
+    try:
+        x_unit_vec = x_vec / mag
+        y_unit_vec = y_vec / mag
+    except ZeroDivisionError:
+        x_unit_vec = x_vec
+        y_unit_vec = y_vec
+
+    # Calculate heading bar start for arrow head.
+    hb_start_x = round(end_x - (x_unit_vec * size))
+    hb_start_y = round(end_y - (y_unit_vec * size))
+    hb_start_point = (hb_start_x, hb_start_y)
+
+    # Calculate arrow head.
+    arrow_start_point = tuple(map(round, rotate_point(*end_point, *hb_start_point, 45)))
+    arrow_end_point = tuple(map(round, rotate_point(*end_point, *hb_start_point, -45)))
+    arrow_head = [
+        (*arrow_start_point, *hb_start_point),
+        (*arrow_end_point, *hb_start_point),
+        (*arrow_start_point, *arrow_end_point),
+    ]
+
+    cross = []
+    if draw_x:
+        # Calculate heading bar end for X.
+        hb_end_x = round(end_x + (x_unit_vec * size))
+        hb_end_y = round(end_y + (y_unit_vec * size))
+        hb_end_point = (hb_end_x, hb_end_y)
+
+        # Calculate cross bar for X.
+        cb_start_point = tuple(map(round, rotate_point(*hb_end_point, *end_point, 90)))
+        cb_end_point = tuple(map(round, rotate_point(*hb_end_point, *end_point, 270)))
+        cross = [
+            (*hb_start_point, *hb_end_point),
+            (*cb_start_point, *cb_end_point),
+        ]
+    return arrow_head, cross
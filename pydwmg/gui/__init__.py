@@ -0,0 +1,5 @@
+"""Qt user interface for PyDWMG, built on the pure Python pydwmg core."""
+
+from pydwmg.gui.main_window import MainWindow, run
+
+__all__ = ["MainWindow", "run"]
@@ -0,0 +1,651 @@
+"""Main map window of the PyDWMG user interface."""
+
+import logging
+import os
+import sys
+import time
+from pathlib import Path
+
+from PyQt5.QtWidgets import (
+    QApplication,
+    QComboBox,
+    QStyle,
+    QWidget,
+    QPushButton,
+    QSlider,
+    QMainWindow,
+    QVBoxLayout,
+    QHBoxLayout,
+    QLabel,
+    QFileDialog,
+    QMessageBox,
+)
+from PyQt5.QtCore import Qt, QThreadPool
+from PyQt5.QtGui import QPainter, QPicture, QIcon
+
+from pydwmg.geometry import clamp_to_map, eq_to_map, heading_vector
+from pydwmg.gui.markers import draw_arrow_marker, draw_circle_marker
+from pydwmg.gui.maps import MapCache, MapView
+from pydwmg.gui.overlay import (
+    HeatmapLayer,
+    MotionOverlay,
+    PlayerOverlay,
+    POILayer,
+    RouteOverlay,
+)
+from pydwmg.gui.supervisor import WorkerSupervisor
+from pydwmg.gui.workers import (
+    FEED_SUFFIXES,
+    EQLogParser,
+    EQLogScanner,
+    HeatmapBuilder,
+    PlayerFeedReader,
+)
+from pydwmg.motion import MotionEstimator
+from pydwmg.players import PlayerTracker
+from pydwmg.poi import GUILD, ZONE_LINE, ZonePOIs, load_pois
+from pydwmg.routes import RoutePlanner, load_zone_graph
+from pydwmg.tracing import setup_logging, traced
+from pydwmg.zones import find_zone, load_zones
+
+logger = logging.getLogger(__name__)
+
+
+class MainWindow(QMainWindow):
+    def __init__(self, *args, **kwargs):
+        super(MainWindow, self).__init__(*args, **kwargs)
+
+        # INIT STUFF
+        QApplication.instance().aboutToQuit.connect(self.quit_app)
+        try:
+            self.zones = load_zones()
+        except FileNotFoundError:
+            logger.critical("zone_info.csv not found, quitting!")
+            sys.exit(1)
+        self.players = PlayerTracker(self.zones)
+        try:
+            self.pois = load_pois()
+        except FileNotFoundError:
+            logger.warning("poi_info.csv not found, no points of interest shown")
+            self.pois = {}
+        # Zone name each guild member is indexed under, to move them on zoning.
+        self.guild_poi_zones = {}
+        # Guild members already offered as route targets. findData cannot
+        # find them, as item data tuples are compared by identity.
+        self.route_players = set()
+        try:
+            self.routes = RoutePlanner(load_zone_graph())
+        except FileNotFoundError:
+            logger.warning("zone_lines.csv not found, routes will not be planned")
+            self.routes = None
+        self.map_cache = MapCache()
+        self.player_feed_files = []
+        self.current_logfile = None
+        self.current_zone = None
+        self.current_loc = None
+        # Heatmaps by zone name, kept for the session once built.
+        self.heatmaps = {}
+        self.motion = MotionEstimator()
+
+        self.title = "Dude, Where's My Guild???"
+        self.setWindowTitle(self.title)
+        self.setWindowIcon(QIcon(os.path.join("icons", "DWMG.png")))
+        outer_layout = QVBoxLayout()
+        tool_layout = QHBoxLayout()
+        map_layout = QVBoxLayout()
+        data_layout = QVBoxLayout()
+        button_layout = QVBoxLayout()
+
+        # WINDOW VARIABLES, could be used for persistance between sessions
+        self.on_top = False
+        self.opacity = 1
+
+        # TOOL BAR
+        self.button_log_folder = QPushButton()
+        self.button_log_folder.setIcon(
+            QApplication.style().standardIcon(QStyle.SP_DialogOpenButton)
+        )
+        self.button_log_folder.setToolTip("Select EQ or log folder")
+        self.button_log_folder.pressed.connect(self.select_eqlog_dir)
+        self.button_add_feed = QPushButton()
+        self.button_add_feed.setIcon(
+            QApplication.style().standardIcon(QStyle.SP_FileDialogNewFolder)
+        )
+        self.button_add_feed.setToolTip("Add a guild member's log or recorded feed")
+        self.button_add_feed.pressed.connect(self.select_player_feed)
+        self.button_on_top = QPushButton()
+        self.button_on_top.setIcon(QIcon(os.path.join("icons", "NotAlwaysOnTop.png")))
+        self.button_on_top.setToolTip("Always on top")
+        self.button_on_top.pressed.connect(self.always_on_top)
+        self.button_heatmap = QPushButton()
+        self.button_heatmap.setIcon(
+            QApplication.style().standardIcon(QStyle.SP_FileDialogContentsView)
+        )
+        self.button_heatmap.setToolTip("Show where you have been most in this zone")
+        self.button_heatmap.setCheckable(True)
+        self.button_heatmap.toggled.connect(self.toggle_heatmap)
+        self.route_select = QComboBox()
+        self.route_select.setToolTip("Plan a route to a zone or guild member")
+        self.route_select.setSizeAdjustPolicy(
+            QComboBox.AdjustToMinimumContentsLengthWithIcon
+        )
+        self.route_select.setMinimumContentsLength(12)
+        self.route_select.addItem("No route", None)
+        if self.routes is not None:
+            for zone_name in self.routes.graph.zone_names():
+                self.route_select.addItem(zone_name, (zone_name, None))
+        self.route_select.currentIndexChanged.connect(self.update_route)
+
+        # SET WINDOW OPACITY AND SETUP SLIDER
+        self.setWindowOpacity(self.opacity)
+        self.opacity_slider = QSlider(Qt.Horizontal)
+        self.opacity_slider.setMinimum(20)
+        self.opacity_slider.setMaximum(100)
+        self.opacity_slider.setTickInterval(1)
+        self.opacity_slider.setValue(self.opacity * 100)
+        self.opacity_slider.setToolTip("Window transparency")
+        self.opacity_slider.valueChanged.connect(self.opacity_changed)
+
+        # MAP LABEL
+        INITIAL_MAP = "Map_eastcommons.jpg"
+        self.map_view = MapView()
+        map_image = self.map_cache.load(INITIAL_MAP)
+        self.map_view.set_image(map_image)
+        self.map_view.resize(map_image.width(), map_image.height())
+        self.resize(map_image.width(), map_image.height())
+        self.heatmap_layer = HeatmapLayer(self.map_view)
+        self.heatmap_layer.resize(map_image.width(), map_image.height())
+        self.heatmap_layer.hide()
+        self.poi_layer = POILayer(self.map_view)
+        self.poi_layer.resize(map_image.width(), map_image.height())
+        self.motion_overlay = MotionOverlay(self.map_view)
+        self.motion_overlay.resize(map_image.width(), map_image.height())
+        self.motion_overlay.track("You", self.motion)
+        self.route_overlay = RouteOverlay(self.map_view)
+        self.route_overlay.resize(map_image.width(), map_image.height())
+        self.player_overlay = PlayerOverlay(self.players, self.map_view)
+        self.player_overlay.resize(map_image.width(), map_image.height())
+
+        # BOTTOM TESTING LABELS
+        label_zone = QLabel("Zone:")
+        self.label_currentzone = QLabel("")
+        label_loc = QLabel("Location:")
+        self.label_currentloc = QLabel("")
+        label_prevloc = QLabel("Previous Location:")
+        self.label_prevloc = QLabel("")
+        label_nearest_zone_line = QLabel("Nearest zone line:")
+        self.label_nearest_zone_line = QLabel("")
+        label_nearest_guild = QLabel("Nearest guild member:")
+        self.label_nearest_guild = QLabel("")
+        label_route = QLabel("Route:")
+        self.label_route = QLabel("")
+        button_quit = QPushButton("Quit")
+        button_quit.pressed.connect(self.quit_app)
+
+        # LAYOUT SETUP
+        tool_layout.addWidget(self.button_log_folder, 0, Qt.AlignLeft)
+        tool_layout.addWidget(self.button_add_feed, 0, Qt.AlignLeft)
+        tool_layout.addWidget(self.button_heatmap, 0, Qt.AlignLeft)
+        tool_layout.addWidget(self.route_select, 0, Qt.AlignLeft)
+        tool_layout.addWidget(self.button_on_top, 1, Qt.AlignLeft)
+        tool_layout.addWidget(self.opacity_slider, 16, Qt.AlignLeft)
+        map_layout.addWidget(self.map_view)
+        data_layout.addStretch()
+        data_layout.addWidget(label_zone)
+        data_layout.addWidget(self.label_currentzone)
+        data_layout.addWidget(label_loc)
+        data_layout.addWidget(self.label_currentloc)
+        data_layout.addWidget(label_prevloc)
+        data_layout.addWidget(self.label_prevloc)
+        data_layout.addWidget(label_nearest_zone_line)
+        data_layout.addWidget(self.label_nearest_zone_line)
+        data_layout.addWidget(label_nearest_guild)
+        data_layout.addWidget(self.label_nearest_guild)
+        data_layout.addWidget(label_route)
+        data_layout.addWidget(self.label_route)
+        button_layout.addWidget(button_quit)
+
+        outer_layout.addLayout(tool_layout)
+        outer_layout.addLayout(map_layout)
+        outer_layout.addLayout(data_layout)
+        outer_layout.addLayout(button_layout)
+
+        w = QWidget()
+        w.setLayout(outer_layout)
+
+        self.setCentralWidget(w)
+
+        self.setMaximumSize(
+            outer_layout.geometry().width(), outer_layout.geometry().height()
+        )
+
+        self.show()
+
+        self.threadpool = QThreadPool()
+        logger.info(
+            "Multithreading with maximum %d threads", self.threadpool.maxThreadCount()
+        )
+        self.workers = WorkerSupervisor(self.threadpool)
+
+        self.get_eqlog_dir()
+        try:
+            self.start_logscanner(self.eqlog_dir)
+        except AttributeError:
+            logger.error("No eq log dir defined, unable to start log scanner thread")
+
+    def get_zone(self, zone_text):
+        return find_zone(self.zones, zone_text)
+
+    @traced("zone-switch")
+    def update_zone(self, zone_text):
+        # Unset saved loc, as it's no longer valid.
+        self.current_loc = None
+        self.motion.reset()
+        zone = self.get_zone(zone_text)
+        if zone is None:
+            self.current_zone = None
+            self.label_currentzone.setText(zone_text)
+            self.player_overlay.set_zone(None)
+            self.heatmap_layer.set_heatmap(None)
+            self.motion_overlay.set_zone(None)
+            self.poi_layer.set_zone(None, None)
+            self.show_nearest()
+            self.update_route()
+            return None
+        self.current_zone = zone
+        self.label_currentzone.setText(zone.zone_name)
+        # Painted straight from the mapped map cache, without a pixmap copy.
+        map_image = self.map_cache.load(zone.map_filename)
+        self.map_base = map_image
+        self.map_view.set_image(map_image)
+        self.map_view.resize(map_image.width(), map_image.height())
+        self.resize(map_image.width(), map_image.height())
+        self.player_overlay.resize(map_image.width(), map_image.height())
+        self.player_overlay.set_zone(zone)
+        self.motion_overlay.resize(map_image.width(), map_image.height())
+        self.motion_overlay.set_zone(zone)
+        self.poi_layer.resize(map_image.width(), map_image.height())
+        self.poi_layer.set_zone(zone, self.pois.get(zone.zone_name))
+        self.route_overlay.resize(map_image.width(), map_image.height())
+        self.show_nearest()
+        self.update_route()
+        self.heatmap_layer.resize(map_image.width(), map_image.height())
+        self.heatmap_layer.set_heatmap(self.heatmaps.get(zone.zone_name))
+        if self.button_heatmap.isChecked():
+            self.build_heatmap()
+
+    def update_loc(self, new_loc, timestamp=None):
+        prev_loc = self.current_loc
+        self.current_loc = new_loc
+        received = time.time()
+        self.motion.add_loc(
+            received if timestamp is None else timestamp, new_loc, received
+        )
+        self.motion_overlay.wake()
+        if self.current_zone is not None:
+            heatmap = self.heatmaps.get(self.current_zone.zone_name)
+            if heatmap is not None:
+                heatmap.add_locs(new_loc)
+                self.heatmap_layer.refresh()
+        # Reverse locs to display them in EQ loc format.
+        self.label_currentloc.setText(f"{tuple(reversed(new_loc))}")
+        if prev_loc is not None:
+            self.label_prevloc.setText(f"{tuple(reversed(prev_loc))}")
+        if self.current_zone is not None:
+            self.draw_map(new_loc, prev_loc)
+        self.show_nearest()
+        self.update_route()
+
+    def zone_pois(self, zone_name):
+        try:
+            return self.pois[zone_name]
+        except KeyError:
+            zone_pois = self.pois[zone_name] = ZonePOIs()
+            return zone_pois
+
+    def update_guild_poi(self, name, kind, value):
+        """Keep a guild member's index entry in step with the player tracker."""
+        player = self.players.player(name)
+        zone_name = None
+        if player.zone is not None and player.loc is not None:
+            zone_name = player.zone.zone_name
+        old_zone_name = self.guild_poi_zones.get(name)
+        if old_zone_name is not None and old_zone_name != zone_name:
+            self.pois[old_zone_name].remove(name, GUILD)
+            del self.guild_poi_zones[name]
+        if zone_name is not None:
+            x, y, _ = player.loc
+            self.zone_pois(zone_name).update(name, GUILD, x, y)
+            self.guild_poi_zones[name] = zone_name
+        if self.routes is not None and name not in self.route_players:
+            self.route_players.add(name)
+            self.route_select.addItem(f"{name} (guild)", (None, name))
+        if self.route_select.currentData() == (None, name):
+            self.update_route()
+        current_zone_name = getattr(self.current_zone, "zone_name", None)
+        if current_zone_name in (zone_name, old_zone_name):
+            self.show_nearest()
+
+    def show_nearest(self):
+        """Show the nearest zone line and guild member to the current loc."""
+        zone_line_text = guild_text = ""
+        if self.current_zone is not None and self.current_loc is not None:
+            zone_pois = self.pois.get(self.current_zone.zone_name)
+            if zone_pois is not None:
+                x, y, _ = self.current_loc
+                zone_line_text = self.nearest_text(zone_pois, x, y, ZONE_LINE)
+                guild_text = self.nearest_text(zone_pois, x, y, GUILD)
+        self.label_nearest_zone_line.setText(zone_line_text)
+        self.label_nearest_guild.setText(guild_text)
+
+    def nearest_text(self, zone_pois, x, y, category):
+        nearest = zone_pois.nearest(x, y, category=category)
+        if not nearest:
+            return ""
+        distance, poi = nearest[0]
+        return f"{poi.name} ({distance:.0f})"
+
+    def update_route(self):
+        """Plan the route to the selected zone or guild member and show it."""
+        route = None
+        target = self.route_select.currentData()
+        if target is not None and self.current_zone is not None:
+            target_zone_name, player_name = target
+            target_loc = None
+            if player_name is not None:
+                player = self.players.player(player_name)
+                # Zones without a map can still be routed to, just not to a loc.
+                target_zone_name = player.zone_name
+                if player.zone is not None:
+                    target_loc = player.loc
+            if target_zone_name is not None:
+                route = self.routes.route(
+                    self.current_zone.zone_name,
+                    self.current_loc,
+                    target_zone_name,
+                    target_loc,
+                )
+        self.route_overlay.set_route(self.current_zone, self.current_loc, route)
+        if target is None:
+            self.label_route.setText("")
+        elif route is None:
+            self.label_route.setText("No known route")
+        elif not route.zone_lines:
+            self.label_route.setText("In this zone")
+        else:
+            zones = len(route.zone_lines)
+            self.label_route.setText(
+                f"{route.zone_lines[0].to_zone_name}"
+                f" ({zones} zone{'s' if zones > 1 else ''} to go)"
+            )
+
+    def update_heading(self, heading, timestamp=None):
+        self.motion.add_heading(
+            time.time() if timestamp is None else timestamp, heading
+        )
+        self.motion_overlay.wake()
+
+    def draw_arrow(self, painter, start_point, end_point, size, draw_x=True):
+        """Draw arrow of given size using painter object."""
+        heading = heading_vector(start_point, end_point)
+        if heading is not None:
+            draw_arrow_marker(painter, end_point, heading, size, draw_x)
+
+    def draw_circle(self, painter, point, size):
+        """Draw circle of given size using painter object."""
+        draw_circle_marker(painter, point, size)
+
+    @traced("draw")
+    def draw_map(self, new_loc, prev_loc):
+        """Draw marker on map based on current and previous location"""
+        # Record the marker to be drawn over the map, which is left untouched.
+        marker = QPicture()
+        painter = QPainter(marker)
+
+        # Set marker sizes to odd numbers so shape is even around center pixel.
+        circle_marker_size = 11
+        cross_marker_size = 9
+
+        # Scale locs to map size using current zone scale factor and offsets.
+        new_x, new_y, _ = new_loc
+        scaled_new_loc = eq_to_map(self.current_zone, new_x, new_y)
+        scaled_new_x, scaled_new_y = scaled_new_loc
+        scaled_prev_loc = None
+        if prev_loc is not None:
+            prev_x, prev_y, _ = prev_loc
+            # Abort map drawing if new and prev locs are the same.
+            if (new_x, new_y) == (prev_x, prev_y):
+                painter.end()
+                return
+            scaled_prev_loc = eq_to_map(self.current_zone, prev_x, prev_y)
+
+        # Check if new loc is within the map image size.
+        map_width = self.map_base.width()
+        map_height = self.map_base.height()
+        if 0 < scaled_new_x < map_width and 0 < scaled_new_y < map_height:
+            if prev_loc is not None:
+                # Use previous loc to draw an arrow showing movement direction.
+                self.draw_arrow(
+                    painter,
+                    scaled_prev_loc,
+                    scaled_new_loc,
+                    cross_marker_size,
+                    draw_x=True,
+                )
+            else:
+                # Draw a circle at the new location.
+                self.draw_circle(painter, scaled_new_loc, circle_marker_size)
+        else:
+            # Adjust new loc so it's within the map image at the closest edge.
+            scaled_new_loc, scaled_prev_loc = clamp_to_map(
+                scaled_new_loc,
+                scaled_prev_loc,
+                map_width,
+                map_height,
+                circle_marker_size,
+            )
+            self.draw_circle(painter, scaled_new_loc, circle_marker_size)
+
+            if prev_loc is not None:
+                # Draw arrow head (without X) to show direction with circle.
+                self.draw_arrow(
+                    painter,
+                    scaled_prev_loc,
+                    scaled_new_loc,
+                    cross_marker_size,
+                    draw_x=False,
+                )
+        painter.end()
+        self.map_view.set_marker(marker)
+
+    def terminate_logparser(self):
+        """Stop the log parsing thread and wait for it to exit."""
+        self.workers.stop("parser")
+
+    def terminate_logscanner(self):
+        """Stop the log dir scanning thread and wait for it to exit."""
+        self.workers.stop("scanner")
+
+    def start_logparser(self, log_file):
+        """Start a thread to parse log file for mapping updates.
+
+        Any parser already running is stopped and joined first.
+        """
+        worker_logparser = EQLogParser(log_file)
+        worker_logparser.signals.zone.connect(self.update_zone)
+        worker_logparser.signals.loc.connect(self.update_loc)
+        worker_logparser.signals.heading.connect(self.update_heading)
+        self.workers.start("parser", worker_logparser)
+
+    def start_logscanner(self, eqlog_dir):
+        """Start a thread to scan log dir for updated log files."""
+        worker_logscanner = EQLogScanner(eqlog_dir)
+        worker_logscanner.signals.logfile.connect(self.change_log_file)
+        self.workers.start("scanner", worker_logscanner)
+
+    def start_player_feed(self, feed_file):
+        """Start a thread feeding another character's positions to the map."""
+        worker_feed = PlayerFeedReader(feed_file)
+        worker_feed.signals.event.connect(self.players.handle_event)
+        worker_feed.signals.event.connect(self.update_guild_poi)
+        worker_feed.signals.event.connect(self.player_overlay.changed)
+        if Path(feed_file) not in self.player_feed_files:
+            self.player_feed_files.append(Path(feed_file))
+        self.workers.start(f"feed {feed_file}", worker_feed)
+
+    def select_player_feed(self):
+        """Show a dialog box to pick guild member logs or recorded feeds."""
+        feed_files, _ = QFileDialog.getOpenFileNames(
+            caption="Select guild member logs or recorded feeds",
+            filter="Logs and feeds (eqlog_*.txt *.ndjson *.jsonl);;All files (*)",
+        )
+        for feed_file in feed_files:
+            self.start_player_feed(Path(feed_file))
+
+    def toggle_heatmap(self, checked):
+        """Show or hide the position heatmap layer for the current zone."""
+        if checked:
+            self.heatmap_layer.show()
+            self.build_heatmap()
+            self.heatmap_layer.refresh()
+        else:
+            self.heatmap_layer.hide()
+
+    def build_heatmap(self):
+        """Start a thread building the current zone's heatmap if not built."""
+        zone = self.current_zone
+        if zone is None or zone.zone_name in self.heatmaps:
+            return
+        log_files = [self.current_logfile] if self.current_logfile else []
+        log_files.extend(
+            feed_file
+            for feed_file in self.player_feed_files
+            if feed_file.suffix not in FEED_SUFFIXES
+        )
+        map_size = (self.map_base.width(), self.map_base.height())
+        worker_heatmap = HeatmapBuilder(self.zones, zone, map_size, log_files)
+        worker_heatmap.signals.built.connect(self.heatmap_built)
+        worker_heatmap.signals.failed.connect(self.heatmap_failed)
+        # Placeholder so the zone is only built once, replaced when done.
+        self.heatmaps[zone.zone_name] = None
+        self.workers.start(f"heatmap {zone.zone_name}", worker_heatmap)
+
+    def heatmap_built(self, heatmap):
+        self.heatmaps[heatmap.zone.zone_name] = heatmap
+        if heatmap.zone is self.current_zone:
+            self.heatmap_layer.set_heatmap(heatmap)
+
+    def heatmap_failed(self, zone_name):
+        """Drop the placeholder of a heatmap whose build failed, to retry later."""
+        if self.heatmaps.get(zone_name, False) is None:
+            del self.heatmaps[zone_name]
+
+    def change_log_file(self, new_file):
+        """Change log file being parsed."""
+        self.terminate_logparser()
+        self.start_logparser(new_file)
+        self.current_logfile = new_file
+        logger.info("Changed log file to %s", new_file)
+
+    def get_eqlog_dir(self):
+        """Get EQ log dir from saved app settings."""
+        try:
+            # Read log file path from local config file:
+            with open("eq_logfile.txt", "rt") as f:
+                eq_logfile_path = f.readline().strip()
+            logger.info(
+                "Found eq_logfile.txt, using eq log directory: %s", eq_logfile_path
+            )
+        except Exception:
+            logger.warning(
+                "Unable to read log file location from eq_logfile.txt, "
+                "create this file for auto-detection"
+            )
+        logfile_path = Path(eq_logfile_path)
+        if Path.is_dir(logfile_path):
+            self.eqlog_dir = Path(logfile_path)
+        else:
+            logger.error("This path is not a directory - %s", eq_logfile_path)
+
+    def select_eqlog_dir(self):
+        """Show a dialog box for the user to select their EQ log folder."""
+
+        def contains_eqlogfiles(folder_path) -> bool:
+            """Check if the selected folder contains EQ log files."""
+            try:
+                next(folder_path.glob("eqlog_*.txt"))
+                return True
+            except StopIteration:
+                return False
+
+        verified_logs_path = None
+        while verified_logs_path is None:
+            # Present dialog box to select logs folder
+            selected_folder = QFileDialog.getExistingDirectory(
+                caption="Select EQ Folder or Logs Folder",
+                options=QFileDialog.ShowDirsOnly | QFileDialog.DontResolveSymlinks,
+            )
+            if selected_folder == "":
+                # User pressed Cancel, close dialog
+                return
+            else:
+                selected_folder_path = Path(selected_folder)
+                if selected_folder_path.joinpath("eqgame.exe").is_file():
+                    # EQ directory selected, check for valid Logs folder
+                    eqdir_logs_path = selected_folder_path.joinpath("Logs")
+                    if contains_eqlogfiles(eqdir_logs_path):
+                        verified_logs_path = eqdir_logs_path
+                if verified_logs_path is None:
+                    # Check if selected folder contains EQ log files
+                    if contains_eqlogfiles(selected_folder_path):
+                        verified_logs_path = selected_folder_path
+                    else:
+                        nologs_message = (
+                            "Please select either your EQ folder or the log"
+                            " folder inside it and ensure you have logging"
+                            " enabled and logs in the log folder."
+                        )
+                        # Popup error and have user select another folder
+                        QMessageBox.warning(self, "Error", nologs_message)
+        # Save new log directory
+        self.eqlog_dir = verified_logs_path
+        with open("eq_logfile.txt", "w") as f:
+            f.write(str(self.eqlog_dir))
+        # Re-start log scanner
+        self.terminate_logscanner()
+        self.start_logscanner(self.eqlog_dir)
+
+    def always_on_top(self):
+        """Toggle always on top window setting."""
+        self.setWindowFlags(self.windowFlags() ^ Qt.WindowStaysOnTopHint)
+        if self.on_top is True:
+            self.on_top = False
+            self.button_on_top.setIcon(
+                QIcon(os.path.join("icons", "NotAlwaysOnTop.png"))
+            )
+        else:
+            self.on_top = True
+            self.button_on_top.setIcon(QIcon(os.path.join("icons", "AlwaysOnTop.png")))
+        self.show()
+
+    def opacity_changed(self):
+        self.opacity = self.opacity_slider.value() / 100
+        self.setWindowOpacity(self.opacity)
+
+    def quit_app(self):
+        """Stop and join every started thread before quitting the app window."""
+        running = sorted(self.workers.workers)
+        self.workers.stop_all()
+        for name in running:
+            if name in self.workers.exit_times:
+                exit_time = self.workers.exit_times[name]
+                logger.info("%s stopped in %.1f ms", name, exit_time * 1000)
+        QApplication.instance().quit()
+
+
+def run(argv=None):
+    """Start the Qt application and block until the main window quits."""
+    setup_logging()
+    app = QApplication([1, "-widgetcount"] if argv is None else argv)
+    window = MainWindow()  # noqa: F841 - keep a reference while running
+    return app.exec()
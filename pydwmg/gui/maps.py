@@ -0,0 +1,357 @@
+"""Pre-decoded zone maps, memory mapped instead of decoded on each zone switch.
+
+build_map_cache decodes every map in maps/ once, in a process pool, and
+writes its pixels uncompressed to the map cache as packed RGB, or as
+palette indices with --indexed. The window shows maps at full size, so
+downscaled copies are only written when asked for. A manifest keys each
+decoded asset by the hash of its source file, and records the size and
+modification time each map had when it was converted.
+
+MapCache maps a cached variant into memory and wraps it in a QImage
+without copying, and MapView paints that image as it is, so only the
+pages that are drawn are read and they are shared through the OS page
+cache. Maps missing from the cache, or changed since it was built, are
+decoded from the JPEG as before.
+"""
+
+import ctypes
+import hashlib
+import json
+import logging
+import mmap
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from PyQt5 import sip
+from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QImage, QPainter, QPixmap
+from PyQt5.QtWidgets import QWidget
+
+logger = logging.getLogger(__name__)
+
+MAPS_DIR = "maps"
+MAP_CACHE_DIR = "map_cache"
+MANIFEST_FILE = "manifest.json"
+# Bumped when the cache layout changes, older caches are rebuilt.
+MANIFEST_VERSION = 1
+MAP_SUFFIXES = (".jpg", ".jpeg", ".png")
+# Size of each variant relative to the original map, only full size is shown.
+SCALES = (1.0,)
+
+RGB888 = "rgb888"
+INDEXED8 = "indexed8"
+FORMATS = {RGB888: QImage.Format_RGB888, INDEXED8: QImage.Format_Indexed8}
+
+
+def scale_key(scale):
+    return f"{scale:g}"
+
+
+def empty_manifest():
+    return {"version": MANIFEST_VERSION, "maps": {}, "assets": {}}
+
+
+def read_manifest(cache_dir=MAP_CACHE_DIR):
+    """Return the map cache manifest, or an empty one if there is no cache."""
+    try:
+        with open(os.path.join(cache_dir, MANIFEST_FILE)) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return empty_manifest()
+    if manifest.get("version") != MANIFEST_VERSION:
+        return empty_manifest()
+    return manifest
+
+
+def write_atomic(filename, data):
+    """Write data to filename so readers never see a partial file."""
+    temp_filename = f"{filename}.tmp"
+    with open(temp_filename, "wb") as f:
+        f.write(data)
+    os.replace(temp_filename, filename)
+
+
+def image_bytes(image):
+    """Return a copy of a QImage's pixel data, including any row padding."""
+    bits = image.constBits()
+    bits.setsize(image.sizeInBytes())
+    return bytes(bits)
+
+
+def convert_map(path, digest, cache_dir, scales=SCALES, fmt=RGB888):
+    """Decode one map and write a raw variant for every scale.
+
+    Runs in a pool process, returning the manifest entry of the asset.
+    Indexed variants all share the palette chosen for the full size map.
+    """
+    source = QImage(path)
+    if source.isNull():
+        raise ValueError(f"could not decode {path}")
+    source = source.convertToFormat(QImage.Format_RGB888)
+    palette = None
+    if fmt == INDEXED8:
+        palette = source.convertToFormat(QImage.Format_Indexed8).colorTable()
+    width, height = source.width(), source.height()
+    asset = {
+        "width": width,
+        "height": height,
+        "format": fmt,
+        "palette": palette,
+        "variants": {},
+    }
+    for scale in scales:
+        variant = source
+        if scale != 1:
+            variant = source.scaled(
+                max(round(width * scale), 1),
+                max(round(height * scale), 1),
+                Qt.IgnoreAspectRatio,
+                Qt.SmoothTransformation,
+            ).convertToFormat(QImage.Format_RGB888)
+        if palette is not None:
+            variant = variant.convertToFormat(QImage.Format_Indexed8, palette)
+        filename = f"{digest[:16]}_{scale_key(scale)}.{fmt}"
+        write_atomic(os.path.join(cache_dir, filename), image_bytes(variant))
+        asset["variants"][scale_key(scale)] = {
+            "file": filename,
+            "width": variant.width(),
+            "height": variant.height(),
+            "bytes_per_line": variant.bytesPerLine(),
+        }
+    return asset
+
+
+def file_digest(path):
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def asset_current(asset, cache_dir, scales, fmt):
+    """Return whether a cached asset has every variant wanted on disk."""
+    if asset is None or asset["format"] != fmt:
+        return False
+    for scale in scales:
+        variant = asset["variants"].get(scale_key(scale))
+        if variant is None:
+            return False
+        if not os.path.exists(os.path.join(cache_dir, variant["file"])):
+            return False
+    return True
+
+
+def build_map_cache(
+    maps_dir=MAPS_DIR,
+    cache_dir=MAP_CACHE_DIR,
+    scales=SCALES,
+    indexed=False,
+    processes=None,
+    force=False,
+):
+    """Convert every changed map in maps_dir into the cache, in parallel.
+
+    Returns the new manifest and the number of maps converted. Maps that
+    are unchanged since the last build are kept, and cache files no
+    longer in the manifest are removed.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    fmt = INDEXED8 if indexed else RGB888
+    old_manifest = read_manifest(cache_dir)
+    manifest = empty_manifest()
+    jobs = {}
+    for filename in sorted(os.listdir(maps_dir)):
+        if not filename.lower().endswith(MAP_SUFFIXES):
+            continue
+        path = os.path.join(maps_dir, filename)
+        stat = os.stat(path)
+        digest = file_digest(path)
+        manifest["maps"][filename] = {
+            "sha256": digest,
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+        }
+        asset = old_manifest["assets"].get(digest)
+        if not force and asset_current(asset, cache_dir, scales, fmt):
+            manifest["assets"][digest] = asset
+        else:
+            # Identical files share a single conversion.
+            jobs[digest] = path
+    if jobs:
+        with ProcessPoolExecutor(processes) as pool:
+            futures = {
+                pool.submit(convert_map, path, digest, cache_dir, scales, fmt): digest
+                for digest, path in jobs.items()
+            }
+            for future in as_completed(futures):
+                try:
+                    asset = future.result()
+                except ValueError as error:
+                    logger.warning("%s", error)
+                    continue
+                manifest["assets"][futures[future]] = asset
+    # Maps that failed to convert are left to be decoded from the JPEG.
+    manifest["maps"] = {
+        filename: entry
+        for filename, entry in manifest["maps"].items()
+        if entry["sha256"] in manifest["assets"]
+    }
+    write_atomic(
+        os.path.join(cache_dir, MANIFEST_FILE),
+        json.dumps(manifest, indent=1).encode(),
+    )
+    used = {
+        variant["file"]
+        for asset in manifest["assets"].values()
+        for variant in asset["variants"].values()
+    }
+    for filename in os.listdir(cache_dir):
+        if filename.endswith(tuple(FORMATS)) and filename not in used:
+            os.remove(os.path.join(cache_dir, filename))
+    return manifest, len(jobs)
+
+
+class MapCache:
+    """Load zone maps from the map cache, or from maps/ if not cached."""
+
+    def __init__(self, maps_dir=MAPS_DIR, cache_dir=MAP_CACHE_DIR):
+        self.maps_dir = maps_dir
+        self.cache_dir = cache_dir
+        self.manifest = read_manifest(cache_dir)
+        # Cache files mapped so far, with their addresses. Images point
+        # into them, so they stay open for the life of the cache.
+        self._mapped = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _map_file(self, filename):
+        """Return a cache file mapped copy on write and its address."""
+        try:
+            return self._mapped[filename]
+        except KeyError:
+            pass
+        try:
+            with open(os.path.join(self.cache_dir, filename), "rb") as f:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+        except (OSError, ValueError):
+            return None, None
+        address = ctypes.addressof(ctypes.c_char.from_buffer(mapped))
+        self._mapped[filename] = mapped, address
+        return mapped, address
+
+    def image(self, map_filename, scale=1.0):
+        """Return a QImage of a cached map variant, or None if not cached.
+
+        The image uses the mapped cache file as its pixels without a copy.
+        """
+        return self._image(map_filename, scale)[0]
+
+    def _image(self, map_filename, scale):
+        """Return a cached variant's QImage and the file it maps, or Nones."""
+        entry = self.manifest["maps"].get(map_filename)
+        if entry is None:
+            return None, None
+        try:
+            stat = os.stat(os.path.join(self.maps_dir, map_filename))
+        except OSError:
+            return None, None
+        if (stat.st_size, stat.st_mtime_ns) != (entry["size"], entry["mtime_ns"]):
+            logger.debug("%s changed since the map cache was built", map_filename)
+            return None, None
+        asset = self.manifest["assets"][entry["sha256"]]
+        variant = asset["variants"].get(scale_key(scale))
+        if variant is None:
+            return None, None
+        mapped, address = self._map_file(variant["file"])
+        if (
+            mapped is None
+            or len(mapped) != variant["bytes_per_line"] * variant["height"]
+        ):
+            return None, None
+        # Given a Python buffer, PyQt builds a read only QImage, which Qt
+        # copies as soon as a palette is set. A pointer gives a writable
+        # one, and any write only lands in this process's copy on write
+        # pages, never in the file.
+        image = QImage(
+            sip.voidptr(address),
+            variant["width"],
+            variant["height"],
+            variant["bytes_per_line"],
+            FORMATS[asset["format"]],
+        )
+        if asset["palette"] is not None:
+            image.setColorTable(asset["palette"])
+        return image, mapped
+
+    def load(self, map_filename, scale=1.0):
+        """Return a QImage of a map, decoding the original if not cached.
+
+        A cached map is returned as the mapped image, for painting as it is.
+        """
+        image = self.image(map_filename, scale)
+        if image is not None:
+            self.hits += 1
+            return image
+        self.misses += 1
+        return self._decode(map_filename, scale)
+
+    def pixmap(self, map_filename, scale=1.0):
+        """Return a QPixmap of a map, decoding the original if not cached."""
+        image, mapped = self._image(map_filename, scale)
+        if image is not None:
+            self.hits += 1
+            pixmap = QPixmap.fromImage(image)
+            # The pixmap has its own copy, so the mapped pages can be let go.
+            if hasattr(mmap, "MADV_DONTNEED"):
+                mapped.madvise(mmap.MADV_DONTNEED)
+            return pixmap
+        self.misses += 1
+        return QPixmap.fromImage(self._decode(map_filename, scale))
+
+    def _decode(self, map_filename, scale):
+        image = QImage(os.path.join(self.maps_dir, map_filename))
+        if scale != 1 and not image.isNull():
+            image = image.scaled(
+                max(round(image.width() * scale), 1),
+                max(round(image.height() * scale), 1),
+                Qt.IgnoreAspectRatio,
+                Qt.SmoothTransformation,
+            )
+        return image
+
+
+class MapView(QWidget):
+    """Widget showing a zone map image with the position marker over it.
+
+    The image is painted from as it is, so a mapped cache image is never
+    converted into a 32-bit pixmap. The marker is recorded as a QPicture
+    and replayed over the map on each paint, leaving the image untouched.
+    """
+
+    def __init__(self, parent=None):
+        super(MapView, self).__init__(parent)
+        self.image = QImage()
+        self.marker = None
+        self.setAttribute(Qt.WA_OpaquePaintEvent)
+
+    def set_image(self, image):
+        """Show a new map, without a marker until set_marker."""
+        self.image = image
+        self.marker = None
+        self.updateGeometry()
+        self.update()
+
+    def set_marker(self, picture):
+        self.marker = picture
+        self.update()
+
+    def sizeHint(self):
+        return self.image.size()
+
+    def minimumSizeHint(self):
+        return self.image.size()
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.drawImage(event.rect(), self.image, event.rect())
+        if self.marker is not None:
+            painter.drawPicture(0, 0, self.marker)
+        painter.end()
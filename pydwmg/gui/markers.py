@@ -0,0 +1,77 @@
+"""Cached marker glyphs stamped onto the map with a per-marker transform.
+
+Each glyph is built once per size as a QPainterPath around the origin,
+pointing along +x. Drawing a marker only sets a transform made from the
+unit heading vector and the marker position, so no trigonometry or pen
+allocation happens per draw.
+"""
+
+import functools
+import math
+
+from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QPainterPath, QPen, QTransform
+
+MARKER_PEN = QPen(Qt.red, 2)
+ARROW_PEN = QPen(Qt.black, 2)
+PLAYER_PEN = QPen(Qt.blue, 2)
+ESTIMATE_PEN = QPen(Qt.darkRed, 1, Qt.DashLine)
+
+
+@functools.lru_cache(maxsize=None)
+def circle_glyph(size):
+    """Circle of diameter size centred on the origin."""
+    path = QPainterPath()
+    path.addEllipse(-size / 2, -size / 2, size, size)
+    return path
+
+
+@functools.lru_cache(maxsize=None)
+def arrow_head_glyph(size):
+    """Arrow head one size ahead of the origin, with 45 degree sides."""
+    side = size / math.sqrt(2)
+    path = QPainterPath()
+    path.moveTo(size, 0)
+    path.lineTo(size - side, -side)
+    path.lineTo(size - side, side)
+    path.closeSubpath()
+    return path
+
+
+@functools.lru_cache(maxsize=None)
+def cross_glyph(size):
+    """X marking the spot, one bar along the heading and one across it."""
+    path = QPainterPath()
+    path.moveTo(size, 0)
+    path.lineTo(-size, 0)
+    path.moveTo(0, -size)
+    path.lineTo(0, size)
+    return path
+
+
+def marker_transform(point, heading):
+    """Return the transform placing a glyph at point, rotated to heading."""
+    heading_x, heading_y = heading
+    return QTransform(heading_x, heading_y, -heading_y, heading_x, *point)
+
+
+def draw_circle_marker(painter, point, size, pen=MARKER_PEN):
+    """Stamp a circle glyph centred on point."""
+    painter.setPen(pen)
+    painter.setBrush(Qt.NoBrush)
+    painter.setTransform(QTransform.fromTranslate(*point))
+    painter.drawPath(circle_glyph(size))
+    painter.resetTransform()
+
+
+def draw_arrow_marker(painter, point, heading, size, draw_x=True):
+    """Stamp an arrow head ahead of point, with a red X on point if draw_x."""
+    painter.setBrush(Qt.NoBrush)
+    painter.setTransform(marker_transform(point, heading))
+    if draw_x:
+        # Draw red X (marks the spot).
+        painter.setPen(MARKER_PEN)
+        painter.drawPath(cross_glyph(size))
+    painter.setPen(ARROW_PEN)
+    painter.drawPath(arrow_head_glyph(size))
+    painter.resetTransform()
@@ -0,0 +1,348 @@
+"""Transparent overlays drawn on top of the map."""
+
+import time
+from collections import deque
+
+from PyQt5.QtWidgets import QLabel, QWidget
+from PyQt5.QtCore import Qt, QPointF, QRect, QTimer
+from PyQt5.QtGui import QImage, QPainter, QPen, QPixmap, QTransform
+
+from pydwmg.geometry import eq_to_map
+from pydwmg.gui.markers import (
+    ARROW_PEN,
+    ESTIMATE_PEN,
+    PLAYER_PEN,
+    arrow_head_glyph,
+    circle_glyph,
+    marker_transform,
+)
+from pydwmg.players import PLAYER_ARROW_SIZE, PLAYER_MARKER_SIZE
+from pydwmg.poi import GUILD
+from pydwmg.tracing import traced
+
+# Overlay repaint rate in frames per second.
+OVERLAY_FPS = 30
+
+LABEL_PEN = QPen(Qt.white, 1)
+POI_PEN = QPen(Qt.yellow, 2)
+POI_MARKER_SIZE = 5
+ROUTE_PEN = QPen(Qt.green, 2, Qt.DashLine)
+WAYPOINT_MARKER_SIZE = 11
+
+# Dead reckoning repaint rate, and the most positions estimated per frame.
+MOTION_FPS = 30
+MAX_ESTIMATES_PER_FRAME = 64
+ESTIMATE_MARKER_SIZE = 9
+
+
+def paint_markers(painter, markers):
+    """Draw every player marker, grouped so each pen is only set once."""
+    if not markers:
+        return
+    circle = circle_glyph(PLAYER_MARKER_SIZE)
+    arrow_head = arrow_head_glyph(PLAYER_ARROW_SIZE)
+    painter.setBrush(Qt.NoBrush)
+    painter.setPen(PLAYER_PEN)
+    for player in markers:
+        painter.setTransform(QTransform.fromTranslate(*player.map_point))
+        painter.drawPath(circle)
+    painter.setPen(ARROW_PEN)
+    for player in markers:
+        if player.heading is not None:
+            painter.setTransform(marker_transform(player.map_point, player.heading))
+            painter.drawPath(arrow_head)
+    painter.resetTransform()
+    painter.setPen(LABEL_PEN)
+    half = PLAYER_MARKER_SIZE / 2
+    for player in markers:
+        x, y = player.map_point
+        painter.drawText(
+            QRect(round(x + half + 1), round(y - 8), 120, 16),
+            Qt.AlignLeft | Qt.AlignVCenter,
+            player.name,
+        )
+
+
+class PlayerOverlay(QWidget):
+    """Child widget of the map view that paints all tracked players.
+
+    Players only change through the tracker, and a timer repaints the
+    overlay at most OVERLAY_FPS times a second when it has changed, so any
+    number of feed updates between frames costs a single paint. The timer
+    only runs from a call to changed() until a frame finds nothing new.
+    """
+
+    def __init__(self, tracker, parent=None):
+        super(PlayerOverlay, self).__init__(parent)
+        self.tracker = tracker
+        self.zone = None
+        self.setAttribute(Qt.WA_TransparentForMouseEvents)
+        self.setAttribute(Qt.WA_NoSystemBackground)
+        self.frame_timer = QTimer(self)
+        self.frame_timer.setInterval(1000 // OVERLAY_FPS)
+        self.frame_timer.timeout.connect(self.next_frame)
+
+    def set_zone(self, zone):
+        self.zone = zone
+        self.update()
+
+    def changed(self, *args):
+        """Note the tracker may have changed, repainting on the next frame."""
+        if not self.frame_timer.isActive():
+            self.frame_timer.start()
+
+    def next_frame(self):
+        if self.tracker.take_dirty():
+            self.update()
+        else:
+            # Nothing changed for a whole frame, sleep until changed().
+            self.frame_timer.stop()
+
+    @traced("draw players")
+    def paintEvent(self, event):
+        if self.zone is None:
+            return
+        markers = self.tracker.markers(self.zone, self.width(), self.height())
+        painter = QPainter(self)
+        paint_markers(painter, markers)
+        painter.end()
+
+
+class HeatmapLayer(QLabel):
+    """Child widget of the map view showing a zone's position heatmap.
+
+    The heatmap image is converted to a pixmap only when its version has
+    changed, and scaled smoothly from heatmap bins up to the map size.
+    """
+
+    def __init__(self, parent=None):
+        super(HeatmapLayer, self).__init__(parent)
+        self.heatmap = None
+        self._version = None
+        self.setAttribute(Qt.WA_TransparentForMouseEvents)
+        self.setScaledContents(True)
+
+    def set_heatmap(self, heatmap):
+        self.heatmap = heatmap
+        self._version = None
+        self.refresh()
+
+    def refresh(self):
+        """Redraw the layer if the heatmap has changed since it was drawn."""
+        if self.heatmap is None:
+            self.clear()
+            return
+        if self.heatmap.version == self._version or not self.isVisible():
+            return
+        self._version = self.heatmap.version
+        image = self.heatmap.image()
+        height, width, _ = image.shape
+        qimage = QImage(image.data, width, height, width * 4, QImage.Format_RGBA8888)
+        # fromImage copies the pixels, so the array can be replaced later.
+        self.setPixmap(
+            QPixmap.fromImage(qimage).scaled(
+                self.width(), self.height(), transformMode=Qt.SmoothTransformation
+            )
+        )
+
+
+class MotionOverlay(QWidget):
+    """Child widget of the map view showing dead reckoned positions.
+
+    A timer estimates positions at MOTION_FPS, working round-robin through
+    the tracked estimators so at most MAX_ESTIMATES_PER_FRAME run in one
+    frame. Only the small areas around markers that moved are repainted.
+    The timer stops once no estimate can move any more, and wake() starts
+    it again when an estimator has new samples.
+    """
+
+    def __init__(self, parent=None):
+        super(MotionOverlay, self).__init__(parent)
+        self.zone = None
+        self.estimators = {}
+        # Map points of the estimates currently drawn, by name.
+        self.points = {}
+        self._queue = deque()
+        # Estimates in a row that found their estimator no longer moving.
+        self._settled = 0
+        self.setAttribute(Qt.WA_TransparentForMouseEvents)
+        self.setAttribute(Qt.WA_NoSystemBackground)
+        self.frame_timer = QTimer(self)
+        self.frame_timer.setInterval(1000 // MOTION_FPS)
+        self.frame_timer.timeout.connect(self.next_frame)
+
+    def track(self, name, estimator):
+        """Start drawing the estimated position from a MotionEstimator."""
+        if name not in self.estimators:
+            self._queue.append(name)
+        self.estimators[name] = estimator
+        self.wake()
+
+    def wake(self):
+        """Start animating again after an estimator was given new samples."""
+        self._settled = 0
+        if not self.frame_timer.isActive():
+            self.frame_timer.start()
+
+    def set_zone(self, zone):
+        self.zone = zone
+        self.points.clear()
+        self.update()
+
+    def marker_rect(self, point):
+        size = ESTIMATE_MARKER_SIZE + 4
+        x, y = point
+        return QRect(round(x - size / 2), round(y - size / 2), size, size)
+
+    def next_frame(self):
+        if self.zone is None or not self._queue:
+            self.frame_timer.stop()
+            return
+        now = time.time()
+        estimates = min(MAX_ESTIMATES_PER_FRAME, len(self._queue))
+        for _ in range(estimates):
+            name = self._queue[0]
+            self._queue.rotate(-1)
+            estimator = self.estimators[name]
+            if estimator.moving(now):
+                self._settled = 0
+            else:
+                self._settled += 1
+            loc, extrapolated = estimator.estimate(now)
+            old_point = self.points.get(name)
+            new_point = None
+            if extrapolated:
+                new_point = eq_to_map(self.zone, loc[0], loc[1])
+                new_x, new_y = new_point
+                if not (0 < new_x < self.width() and 0 < new_y < self.height()):
+                    new_point = None
+            if old_point is not None and new_point is not None:
+                moved = abs(new_x - old_point[0]) + abs(new_y - old_point[1])
+                if moved < 0.5:
+                    continue
+            elif old_point is None and new_point is None:
+                continue
+            if old_point is not None:
+                self.update(self.marker_rect(old_point))
+            if new_point is not None:
+                self.points[name] = new_point
+                self.update(self.marker_rect(new_point))
+            else:
+                del self.points[name]
+        # A full round of settled estimates has drawn every estimator where
+        # it came to rest, so nothing can move until wake().
+        if self._settled >= len(self._queue):
+            self.frame_timer.stop()
+
+    @traced("draw motion")
+    def paintEvent(self, event):
+        if not self.points:
+            return
+        circle = circle_glyph(ESTIMATE_MARKER_SIZE)
+        painter = QPainter(self)
+        painter.setBrush(Qt.NoBrush)
+        painter.setPen(ESTIMATE_PEN)
+        for point in self.points.values():
+            if event.rect().intersects(self.marker_rect(point)):
+                painter.setTransform(QTransform.fromTranslate(*point))
+                painter.drawPath(circle)
+        painter.end()
+
+
+class POILayer(QWidget):
+    """Child widget of the map view marking a zone's static points of interest.
+
+    Points only change with the zone, so the layer is only repainted when
+    the zone or map size changes.
+    """
+
+    def __init__(self, parent=None):
+        super(POILayer, self).__init__(parent)
+        self.zone = None
+        self.pois = None
+        self.setAttribute(Qt.WA_TransparentForMouseEvents)
+        self.setAttribute(Qt.WA_NoSystemBackground)
+
+    def set_zone(self, zone, pois):
+        self.zone = zone
+        self.pois = pois
+        self.update()
+
+    @traced("draw pois")
+    def paintEvent(self, event):
+        if self.zone is None or self.pois is None:
+            return
+        circle = circle_glyph(POI_MARKER_SIZE)
+        half = POI_MARKER_SIZE / 2
+        painter = QPainter(self)
+        painter.setBrush(Qt.NoBrush)
+        for poi in self.pois.pois.values():
+            if poi.category == GUILD:
+                # Guild members are drawn by the player overlay.
+                continue
+            x, y = eq_to_map(self.zone, poi.x, poi.y)
+            if not (0 < x < self.width() and 0 < y < self.height()):
+                continue
+            painter.setPen(POI_PEN)
+            painter.setTransform(QTransform.fromTranslate(x, y))
+            painter.drawPath(circle)
+            painter.resetTransform()
+            painter.setPen(LABEL_PEN)
+            painter.drawText(
+                QRect(round(x + half + 1), round(y - 8), 160, 16),
+                Qt.AlignLeft | Qt.AlignVCenter,
+                poi.name,
+            )
+        painter.end()
+
+
+class RouteOverlay(QWidget):
+    """Child widget of the map view pointing the way to the next waypoint."""
+
+    def __init__(self, parent=None):
+        super(RouteOverlay, self).__init__(parent)
+        self.zone = None
+        self.start = None
+        self.waypoint = None
+        self.label = ""
+        self.setAttribute(Qt.WA_TransparentForMouseEvents)
+        self.setAttribute(Qt.WA_NoSystemBackground)
+
+    def set_route(self, zone, loc, route):
+        """Show the next waypoint of a Route from loc, or nothing if None."""
+        start = waypoint = None
+        label = ""
+        if zone is not None and route is not None and route.waypoint is not None:
+            waypoint = eq_to_map(zone, *route.waypoint)
+            if loc is not None:
+                start = eq_to_map(zone, loc[0], loc[1])
+            if route.zone_lines:
+                label = route.zone_lines[0].to_zone_name
+        if (start, waypoint, label) == (self.start, self.waypoint, self.label):
+            return
+        self.zone = zone
+        self.start, self.waypoint, self.label = start, waypoint, label
+        self.update()
+
+    @traced("draw route")
+    def paintEvent(self, event):
+        if self.waypoint is None:
+            return
+        x, y = self.waypoint
+        painter = QPainter(self)
+        painter.setBrush(Qt.NoBrush)
+        painter.setPen(ROUTE_PEN)
+        if self.start is not None:
+            painter.drawLine(QPointF(*self.start), QPointF(x, y))
+        painter.setTransform(QTransform.fromTranslate(x, y))
+        painter.drawPath(circle_glyph(WAYPOINT_MARKER_SIZE))
+        painter.resetTransform()
+        if self.label:
+            painter.setPen(LABEL_PEN)
+            half = WAYPOINT_MARKER_SIZE / 2
+            painter.drawText(
+                QRect(round(x + half + 1), round(y - 8), 160, 16),
+                Qt.AlignLeft | Qt.AlignVCenter,
+                self.label,
+            )
+        painter.end()
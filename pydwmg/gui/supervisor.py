@@ -0,0 +1,106 @@
+"""Ownership of every background worker run on the thread pool.
+
+Workers are started under a name, and starting another worker under the
+same name stops the old one and waits for it to return first, so two
+parsers never follow logs at once. Stopping interrupts any wait the
+worker is in, and each join is bounded by a timeout so a stuck worker
+cannot hang the window. How long each worker took to exit is recorded.
+"""
+
+import logging
+import time
+
+from PyQt5.QtCore import QThreadPool
+
+logger = logging.getLogger(__name__)
+
+# Seconds to wait for a worker to return after asking it to stop.
+JOIN_TIMEOUT = 2.0
+
+
+class WorkerSupervisor:
+    """Start, stop and join named Workers on a thread pool."""
+
+    def __init__(self, threadpool=None, join_timeout=JOIN_TIMEOUT):
+        self.threadpool = QThreadPool() if threadpool is None else threadpool
+        self.join_timeout = join_timeout
+        self.workers = {}
+        # Seconds from stop to exit of the last worker under each name.
+        self.exit_times = {}
+        # Workers that did not exit within the join timeout.
+        self.stragglers = []
+
+    def __contains__(self, name):
+        return name in self.workers
+
+    def start(self, name, worker):
+        """Run worker under name, stopping any worker already using the name."""
+        self.stop(name)
+        self.workers[name] = worker
+        # Most workers run until stopped, so each needs its own thread.
+        if self.threadpool.maxThreadCount() < len(self.workers):
+            self.threadpool.setMaxThreadCount(len(self.workers))
+        self.threadpool.start(worker)
+        return worker
+
+    def stop(self, name, timeout=None):
+        """Stop the worker under name and wait for it, returning if it exited."""
+        self._prune()
+        worker = self.workers.pop(name, None)
+        if worker is None:
+            return True
+        return self._join([(name, worker)], timeout)
+
+    def stop_matching(self, prefix, timeout=None):
+        """Stop every worker whose name starts with prefix."""
+        self._prune()
+        names = [name for name in self.workers if name.startswith(prefix)]
+        return self._join([(name, self.workers.pop(name)) for name in names], timeout)
+
+    def stop_all(self, timeout=None):
+        """Stop every worker, waiting for them together."""
+        self._prune()
+        workers = list(self.workers.items())
+        self.workers.clear()
+        return self._join(workers, timeout)
+
+    def _join(self, workers, timeout):
+        """Stop workers, then wait for all of them within one timeout."""
+        if timeout is None:
+            timeout = self.join_timeout
+        # Workers that returned on their own have no exit time to measure.
+        workers = [(name, worker) for name, worker in workers if not worker.join(0)]
+        stopped_at = time.monotonic()
+        for name, worker in workers:
+            self._disconnect(worker)
+            worker.stop()
+            # Never started, so it can be dropped from the queue.
+            if self.threadpool.tryTake(worker):
+                worker.finish()
+        deadline = stopped_at + timeout
+        all_exited = True
+        for name, worker in workers:
+            if not worker.join(max(deadline - time.monotonic(), 0)):
+                logger.warning("%s did not stop within %gs", name, timeout)
+                self.stragglers.append(worker)
+                all_exited = False
+                continue
+            exit_time = worker.finished_at - stopped_at
+            self.exit_times[name] = exit_time
+            logger.debug("%s stopped in %.1f ms", name, exit_time * 1000)
+        return all_exited
+
+    def _disconnect(self, worker):
+        """Stop a worker's signals reaching the window once it is replaced."""
+        try:
+            worker.signals.disconnect()
+        except TypeError:
+            # Nothing was connected.
+            pass
+
+    def _prune(self):
+        """Forget workers that have finished on their own."""
+        for name, worker in list(self.workers.items()):
+            if worker.join(0):
+                del self.workers[name]
+        self.stragglers = [worker for worker in self.stragglers if not worker.join(0)]
@@ -0,0 +1,299 @@
+"""Background QRunnable workers that feed the main window.
+
+Workers are started and stopped by a WorkerSupervisor. They wait with
+Worker.wait rather than sleeping, so stop() interrupts any wait at once,
+and signal through join() when run has returned.
+"""
+
+import logging
+import threading
+import time
+from pathlib import Path
+
+from PyQt5.QtCore import QObject, QRunnable, pyqtSlot, pyqtSignal
+
+from pydwmg.events import HEADING, LOC, ZONE, classify_line
+from pydwmg.heatmap import Heatmap, read_zone_locs
+from pydwmg.logfile import LogTailer, find_starting_zone
+from pydwmg.players import read_feed
+from pydwmg.polling import PollSchedule
+from pydwmg.service import source_name
+from pydwmg.tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+# Recorded feeds with these suffixes are replayed, anything else is tailed.
+FEED_SUFFIXES = (".ndjson", ".jsonl")
+
+# Fastest and slowest log polls before idling, in seconds.
+POLL_INTERVAL = 0.1
+POLL_MAX_INTERVAL = 1.0
+# Fastest and slowest log folder scans before idling, in seconds.
+SCAN_INTERVAL = 2.0
+SCAN_MAX_INTERVAL = 10.0
+
+
+class LogParserSignals(QObject):
+    """Defines the signals available from a running worker thread."""
+
+    zone = pyqtSignal(str)
+    loc = pyqtSignal(tuple, float)
+    heading = pyqtSignal(str, float)
+
+
+class LogScannerSignals(QObject):
+    """Defines the signals available from a running worker thread."""
+
+    logfile = pyqtSignal(Path)
+
+
+class PlayerFeedSignals(QObject):
+    """Defines the signals available from a running worker thread."""
+
+    event = pyqtSignal(str, str, object)
+
+
+class HeatmapBuilderSignals(QObject):
+    """Defines the signals available from a running worker thread."""
+
+    built = pyqtSignal(object)
+    # Zone name of a heatmap whose build raised. Builds are only stopped by
+    # the supervisor, which disconnects them first, so stops are not sent.
+    failed = pyqtSignal(str)
+
+
+class Worker(QRunnable):
+    """Base of the background workers, subclasses do their work in work()."""
+
+    def __init__(self):
+        super(Worker, self).__init__()
+        self._stopped = False
+        self._wake = threading.Event()
+        self._finished = threading.Event()
+        self.finished_at = None
+        # Owned by the supervisor, not deleted by the pool after running.
+        self.setAutoDelete(False)
+
+    def stop(self):
+        """Ask the worker to stop, interrupting any wait."""
+        self._stopped = True
+        self._wake.set()
+
+    def stopped(self):
+        """Return whether the worker was asked to stop."""
+        return self._stopped
+
+    def wait(self, timeout):
+        """Wait up to timeout seconds, returning True early if stopped."""
+        return self._wake.wait(timeout)
+
+    def join(self, timeout=None):
+        """Wait for run to return, returning False if it timed out."""
+        return self._finished.wait(timeout)
+
+    def finish(self):
+        """Mark the worker finished without running, when taken from the pool."""
+        self.finished_at = time.monotonic()
+        self._finished.set()
+
+    @pyqtSlot()
+    def run(self):
+        try:
+            if not self._stopped:
+                self.work()
+        except Exception:
+            logger.exception("%s failed", type(self).__name__)
+        finally:
+            self.finish()
+
+    def work(self):
+        raise NotImplementedError
+
+
+class EQLogScanner(Worker):
+    """Worker thread finding the most recently written log in a folder."""
+
+    def __init__(self, eqlog_dir, *args, **kwargs):
+        super(EQLogScanner, self).__init__()
+        # Store constructor arguments (re-used for processing)
+        self.args = args
+        self.kwargs = kwargs
+        self.signals = LogScannerSignals()
+        self.eqlogscan_dir = eqlog_dir
+        self.current_logfile = None
+        self.schedule = PollSchedule(
+            SCAN_INTERVAL, SCAN_MAX_INTERVAL, name=f"Scanner {eqlog_dir}"
+        )
+
+    def work(self):
+        """Scan log dir to find most recently modified file."""
+
+        logger.info("Scanner thread started for dir: %s...", self.eqlogscan_dir)
+        eqlog_format = "eqlog_*.txt"
+        last_mtime = None
+        while not self._stopped:
+            eqlog_files = Path(self.eqlogscan_dir).glob(eqlog_format)
+            mtimes = [(f.stat().st_mtime, f) for f in eqlog_files]
+            last_mtime_seen, last_modified = max(mtimes, default=(None, None))
+            if last_mtime_seen != last_mtime:
+                # Some log was written to, scan quickly while the game runs.
+                last_mtime = last_mtime_seen
+                self.schedule.activity()
+                interval = self.schedule.interval
+            else:
+                interval = self.schedule.next_interval()
+            if last_modified != self.current_logfile and last_modified is not None:
+                # Store resolved path as current logfile and emit
+                self.current_logfile = last_modified.resolve()
+                self.signals.logfile.emit(self.current_logfile)
+            self.wait(interval)
+
+        logger.info("Scanner thread stopped for dir: %s.", self.eqlogscan_dir)
+
+
+class EQLogParser(Worker):
+    """Worker thread following a log file for zone, loc and heading events."""
+
+    def __init__(self, log_file, *args, **kwargs):
+        super(EQLogParser, self).__init__()
+        # Store constructor arguments (re-used for processing)
+        self.args = args
+        self.kwargs = kwargs
+        self.signals = LogParserSignals()
+        self.log_file = log_file
+        self.schedule = PollSchedule(
+            POLL_INTERVAL, POLL_MAX_INTERVAL, name=f"Parser {Path(log_file).name}"
+        )
+
+    def work(self):
+        """Parse log file for updated zone and loc data."""
+        logger.info("Parser thread started for file: %s...", self.log_file)
+
+        # Get starting zone before beginning log read loop
+        starting_zone = find_starting_zone(self.log_file, self.stopped)
+        if starting_zone is not None:
+            logger.info("Found starting zone %s", starting_zone)
+            self.signals.zone.emit(starting_zone)
+
+        # Start log read loop
+        with LogTailer(self.log_file) as tailer:
+            while not self._stopped:
+                lines = tailer.readlines()
+                if not lines:
+                    self.wait(self.schedule.next_interval())
+                    continue
+                self.schedule.activity()
+                with tracer.span("parse", lines=len(lines)):
+                    self.emit_events(lines)
+        logger.info("Parser thread stopped for file: %s.", self.log_file)
+
+    def emit_events(self, lines):
+        for line in lines:
+            event = classify_line(line)
+            if event is None:
+                continue
+            if event.kind == ZONE:
+                self.signals.zone.emit(event.value)
+            elif event.kind == LOC:
+                self.signals.loc.emit(event.value, event.time)
+            elif event.kind == HEADING:
+                self.signals.heading.emit(event.value, event.time)
+
+
+class PlayerFeedReader(Worker):
+    """
+    Worker thread that feeds another character's position to the shared
+    map, either by tailing their log or replaying a recorded service feed.
+    """
+
+    def __init__(self, feed_file, replay_interval=0.1, max_pause=5.0):
+        super(PlayerFeedReader, self).__init__()
+        self.signals = PlayerFeedSignals()
+        self.feed_file = Path(feed_file)
+        self.replay_interval = replay_interval
+        self.max_pause = max_pause
+        self.schedule = PollSchedule(
+            POLL_INTERVAL, POLL_MAX_INTERVAL, name=f"Feed {self.feed_file.name}"
+        )
+
+    def work(self):
+        logger.info("Player feed started for file: %s...", self.feed_file)
+        if self.feed_file.suffix in FEED_SUFFIXES:
+            self.replay()
+        else:
+            self.tail()
+        logger.info("Player feed stopped for file: %s.", self.feed_file)
+
+    def replay(self):
+        """Emit recorded frames, paced by their log times where recorded.
+
+        Gaps between frames are capped at max_pause, frames without a time
+        are replayed replay_interval apart.
+        """
+        last_time = None
+        for src, event in read_feed(self.feed_file):
+            if event.time is not None and last_time is not None:
+                pause = min(max(event.time - last_time, 0), self.max_pause)
+            elif event.kind == LOC:
+                pause = self.replay_interval
+            else:
+                pause = 0
+            if event.time is not None:
+                last_time = event.time
+            if (pause and self.wait(pause)) or self._stopped:
+                return
+            self.signals.event.emit(src, event.kind, event.value)
+
+    def tail(self):
+        """Emit zone and loc events from a character's log as they are written."""
+        src = source_name(self.feed_file)
+        starting_zone = find_starting_zone(self.feed_file, self.stopped)
+        if starting_zone is not None:
+            self.signals.event.emit(src, ZONE, starting_zone)
+        with LogTailer(self.feed_file) as tailer:
+            while not self._stopped:
+                lines = tailer.readlines()
+                if not lines:
+                    self.wait(self.schedule.next_interval())
+                    continue
+                self.schedule.activity()
+                with tracer.span("parse", src=src, lines=len(lines)):
+                    for line in lines:
+                        event = classify_line(line)
+                        if event is not None:
+                            self.signals.event.emit(src, event.kind, event.value)
+
+
+class HeatmapBuilder(Worker):
+    """Worker thread binning every loc recorded in a zone into a heatmap."""
+
+    def __init__(self, zones, zone, map_size, log_files):
+        super(HeatmapBuilder, self).__init__()
+        self.signals = HeatmapBuilderSignals()
+        self.zones = zones
+        self.zone = zone
+        self.map_size = map_size
+        self.log_files = log_files
+
+    def work(self):
+        try:
+            self.build()
+        except Exception:
+            self.signals.failed.emit(self.zone.zone_name)
+            raise
+
+    def build(self):
+        """Build and emit the heatmap, unless stopped first."""
+        logger.info("Building heatmap for %s...", self.zone.zone_name)
+        heatmap = Heatmap(self.zone, *self.map_size)
+        with tracer.span("build heatmap", zone=self.zone.zone_name):
+            for locs in read_zone_locs(
+                self.log_files, self.zones, self.zone.zone_name, stopped=self.stopped
+            ):
+                heatmap.add_locs(locs)
+        if self._stopped:
+            return
+        logger.info(
+            "Built heatmap for %s from %d locs.", self.zone.zone_name, heatmap.total
+        )
+        self.signals.built.emit(heatmap)
@@ -0,0 +1,151 @@
+"""Position density heatmaps of a zone, binned in map pixel space.
+
+Locs are transformed with the zone scale factor and offsets (the same
+transform as geometry.eq_to_map) and counted into a 2D histogram of
+bin_size pixel cells. New locs are added to the existing counts, and the
+blurred RGBA image is only recalculated when the counts have changed.
+"""
+
+import math
+
+import numpy as np
+
+from pydwmg.events import LOC, ZONE, classify_line
+from pydwmg.zones import find_zone
+
+# Batches smaller than this are added point by point rather than by
+# counting a whole grid sized histogram.
+SMALL_BATCH = 1024
+# Locs collected from a log before they are handed over as one array.
+READ_BATCH = 65536
+# Lines read between checks of whether a read was asked to stop.
+STOP_CHECK_LINES = 4096
+
+
+class Heatmap:
+    """Accumulated loc density for one zone map."""
+
+    def __init__(self, zone, map_width, map_height, bin_size=4, blur_sigma=1.5):
+        self.zone = zone
+        self.map_width = map_width
+        self.map_height = map_height
+        self.bin_size = bin_size
+        self.blur_sigma = blur_sigma
+        self.bins_x = math.ceil(map_width / bin_size)
+        self.bins_y = math.ceil(map_height / bin_size)
+        self.counts = np.zeros(self.bins_x * self.bins_y, dtype=np.int64)
+        self.total = 0
+        # Bumped on every change so renderers can tell when to refresh.
+        self.version = 0
+        self._image = None
+        self._image_version = -1
+
+    def __repr__(self):
+        return f"Heatmap({self.zone.zone_name}, {self.total} locs)"
+
+    def bin_indices(self, locs):
+        """Return flat bin indices of the locs that fall inside the map."""
+        locs = np.asarray(locs, dtype=np.float64)
+        if locs.ndim == 1:
+            locs = locs[np.newaxis]
+        scale = 1 / (self.zone.map_scale_factor * self.bin_size)
+        col = np.floor(self.zone.offset_x / self.bin_size - locs[:, 0] * scale)
+        row = np.floor(self.zone.offset_y / self.bin_size - locs[:, 1] * scale)
+        inside = (col >= 0) & (col < self.bins_x) & (row >= 0) & (row < self.bins_y)
+        return row[inside].astype(np.intp) * self.bins_x + col[inside].astype(np.intp)
+
+    def add_locs(self, locs):
+        """Add an (N, 2) or (N, 3) array of EQ x, y(, z) locs in map order."""
+        indices = self.bin_indices(locs)
+        if not len(indices):
+            return
+        if len(indices) < SMALL_BATCH:
+            np.add.at(self.counts, indices, 1)
+        else:
+            self.counts += np.bincount(indices, minlength=len(self.counts))
+        self.total += len(indices)
+        self.version += 1
+
+    def density(self):
+        """Return the blurred counts as a (bins_y, bins_x) array scaled to 0-1."""
+        grid = self.counts.reshape(self.bins_y, self.bins_x).astype(np.float32)
+        grid = gaussian_blur(grid, self.blur_sigma)
+        peak = grid.max()
+        if peak > 0:
+            grid /= peak
+        return grid
+
+    def image(self):
+        """Return the heatmap as a (bins_y, bins_x, 4) RGBA uint8 array.
+
+        Density runs from transparent yellow through to opaque red, and the
+        result is cached until more locs are added.
+        """
+        if self._image_version != self.version:
+            density = np.sqrt(self.density())
+            image = np.empty(density.shape + (4,), dtype=np.uint8)
+            image[..., 0] = 255
+            image[..., 1] = (255 * (1 - density)).astype(np.uint8)
+            image[..., 2] = 0
+            image[..., 3] = (200 * density).astype(np.uint8)
+            self._image = image
+            self._image_version = self.version
+        return self._image
+
+
+def gaussian_blur(grid, sigma):
+    """Return grid blurred by a separable Gaussian of sigma cells."""
+    if sigma <= 0:
+        return grid
+    radius = max(1, math.ceil(3 * sigma))
+    offsets = np.arange(-radius, radius + 1)
+    kernel = np.exp(-(offsets ** 2) / (2 * sigma ** 2))
+    kernel /= kernel.sum()
+    for axis in (0, 1):
+        # Blur along the first axis of a view, padded with empty cells.
+        moved = np.moveaxis(grid, axis, 0)
+        padded = np.pad(moved, ((radius, radius), (0, 0)))
+        length = moved.shape[0]
+        blurred = np.zeros_like(moved)
+        for offset, weight in enumerate(kernel):
+            blurred += weight * padded[offset : offset + length]
+        grid = np.moveaxis(blurred, 0, axis)
+    return grid
+
+
+def read_zone_locs(logfiles, zones, zone_name, batch_size=READ_BATCH, stopped=None):
+    """Yield arrays of the locs recorded in a zone across whole log files.
+
+    stopped is an optional function checked every STOP_CHECK_LINES lines,
+    reading ends early without the last partial batch once it returns True.
+    """
+    batch = []
+    for logfile in logfiles:
+        in_zone = False
+        with open(logfile, "rt", errors="replace") as f:
+            for line_number, line in enumerate(f):
+                if (
+                    stopped is not None
+                    and line_number % STOP_CHECK_LINES == 0
+                    and stopped()
+                ):
+                    return
+                # Cheap substring checks skip the regexes for chat and combat.
+                if "Your Location is" in line:
+                    if not in_zone:
+                        continue
+                elif "You have entered" not in line:
+                    continue
+                event = classify_line(line)
+                if event is None:
+                    continue
+                if event.kind == ZONE:
+                    zone = find_zone(zones, event.value)
+                    in_zone = zone is not None and zone.zone_name == zone_name
+                elif event.kind == LOC:
+                    batch.append(event.value)
+                    if len(batch) >= batch_size:
+                        yield np.array(batch)
+                        batch = []
+    if batch:
+        yield np.array(batch)
@@ -0,0 +1,190 @@
+"""Reading EQ log files, both backwards from the end and tailing forwards."""
+
+import os
+
+from pydwmg.events import ZONE, classify_line
+
+# Bytes read per call when tailing, large enough to catch up on a busy log
+# in a handful of reads.
+CHUNK_SIZE = 1024 * 1024
+MAX_CHUNKS_PER_READ = 64
+# Leading bytes, and bytes just before the read position, compared to
+# notice a truncated log that has already grown back past the read position.
+HEAD_SIZE = 64
+TAIL_SIZE = 64
+LOG_ENCODING = "utf-8"
+
+
+def reverse_readline(filename, buffer_size=1024):
+    """A generator that returns the lines of a file in reverse order"""
+    SEEK_FILE_END = 2  # seek "whence" value for end of stream
+
+    with open(filename) as fd:
+        first_line = None
+        offset = 0
+        file_size = bytes_remaining = fd.seek(0, SEEK_FILE_END)
+        while bytes_remaining > 0:
+            offset = min(file_size, offset + buffer_size)
+            fd.seek(file_size - offset)
+            read_buffer = fd.read(min(bytes_remaining, buffer_size))
+            bytes_remaining -= buffer_size
+            lines = read_buffer.split("\n")
+            if first_line is not None:
+                """The first line of the buffer is probably not a complete
+                line, so store it and add it to the end of the next buffer.
+                Unless there is already a newline at the end of the buffer,
+                then just yield it because it is a complete line.
+                """
+                if read_buffer[-1] != "\n":
+                    lines[-1] += first_line
+                else:
+                    yield first_line
+            first_line = lines[0]
+            for line_num in range(len(lines) - 1, 0, -1):
+                if lines[line_num]:
+                    yield lines[line_num]
+
+        if first_line is not None:
+            """Current first_line is never yielded in the while loop"""
+            yield first_line
+
+
+def find_starting_zone(filename, stopped=None):
+    """Return the most recently entered zone name in a log file, or None.
+
+    stopped is an optional function checked before each line, the scan
+    gives up and returns None as soon as it returns True.
+    """
+    for line in reverse_readline(filename):
+        if stopped is not None and stopped():
+            return None
+        event = classify_line(line)
+        if event is not None and event.kind == ZONE:
+            return event.value
+    return None
+
+
+class LogTailer:
+    """Follow a log file from its current end, returning newly written lines.
+
+    The file is read in large binary chunks and split into lines here, an
+    incomplete last line is held back until the rest of it is written.
+    Truncation (the file shrinking below the read position, or its first
+    bytes or the bytes before the read position changing) restarts from
+    the beginning of the file, and replacement of the file at the same path
+    (archiving or rotation) finishes reading the old file before following
+    the new one from its start. Neither needs a rescan of the log.
+
+    Usable as a context manager, readlines() never blocks and returns an
+    empty list when nothing new has been written.
+    """
+
+    def __init__(self, filename, chunk_size=CHUNK_SIZE, encoding=LOG_ENCODING):
+        self.filename = filename
+        self.chunk_size = chunk_size
+        self.encoding = encoding
+        self.truncations = 0
+        self.rotations = 0
+        self._file = None
+        self._file_id = None
+        self._position = 0
+        self._partial = b""
+        self._head = b""
+        self._tail = b""
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def open(self, from_start=False):
+        self._file = open(self.filename, "rb")
+        stat = os.fstat(self._file.fileno())
+        self._file_id = (stat.st_dev, stat.st_ino)
+        self._partial = b""
+        self._head = self._file.read(HEAD_SIZE)
+        self._tail = b""
+        if from_start:
+            self._position = self._file.seek(0)
+        else:
+            self._position = self._file.seek(0, os.SEEK_END)  # Go to the end
+            self._file.seek(max(self._position - TAIL_SIZE, 0))
+            self._tail = self._file.read(self._position - self._file.tell())
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def readlines(self):
+        """Return a list of complete lines written since the last call."""
+        if self._truncated():
+            # File was truncated in place, start again from the beginning.
+            self.truncations += 1
+            self._file.seek(0)
+            self._position = 0
+            self._partial = b""
+            self._tail = b""
+        lines = self._read_lines()
+        if not lines and self._replaced():
+            # Whatever is left of the old file is all it will ever contain.
+            if self._partial:
+                lines.append(self._decode(self._partial))
+            self.rotations += 1
+            self.close()
+            self.open(from_start=True)
+            lines.extend(self._read_lines())
+        return lines
+
+    def _read_lines(self):
+        chunks = [self._partial]
+        # Bound each call so catching up on a large backlog stays responsive,
+        # the rest is returned by the following calls.
+        for _ in range(MAX_CHUNKS_PER_READ):
+            chunk = self._file.read(self.chunk_size)
+            if not chunk:
+                break
+            self._position += len(chunk)
+            chunks.append(chunk)
+        data = b"".join(chunks)
+        if not data:
+            return []
+        if len(chunks) > 1:
+            self._tail = (self._tail + data[len(self._partial) :])[-TAIL_SIZE:]
+        lines = data.split(b"\n")
+        # The last element is empty or a line that is still being written.
+        self._partial = lines.pop()
+        return [self._decode(line) for line in lines]
+
+    def _truncated(self):
+        """Return whether the file was cut short since the last read."""
+        if os.fstat(self._file.fileno()).st_size < self._position:
+            self._head = b""
+            return True
+        self._file.seek(0)
+        head = self._file.read(HEAD_SIZE)
+        size = min(len(head), len(self._head))
+        changed = head[:size] != self._head[:size]
+        # A log rewritten with the same first line still differs just before
+        # the old read position.
+        if not changed and self._tail:
+            self._file.seek(self._position - len(self._tail))
+            changed = self._file.read(len(self._tail)) != self._tail
+        self._file.seek(self._position)
+        if changed or len(head) > len(self._head):
+            self._head = head
+        return changed
+
+    def _decode(self, line):
+        return line.rstrip(b"\r").decode(self.encoding, errors="replace")
+
+    def _replaced(self):
+        """Return whether the path now refers to a different file."""
+        try:
+            stat = os.stat(self.filename)
+        except FileNotFoundError:
+            # Moved away and not recreated yet, keep the old file for now.
+            return False
+        return (stat.st_dev, stat.st_ino) != self._file_id
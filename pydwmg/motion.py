@@ -0,0 +1,123 @@
+"""Dead reckoning of a character's position between sparse /loc samples.
+
+Players only report their position when they type /loc, so between
+samples the position is extrapolated from the velocity of recent samples.
+A newer "You think you are heading ..." line turns the estimate onto the
+sensed heading at the last known speed. Extrapolation stops after
+max_extrapolation seconds so a character that stopped moving does not
+drift off across the map.
+
+Sample times are log times, which are used for velocities. How long ago
+the last sample was is measured from when it was received instead, so
+replayed or delayed logs still extrapolate from the moment they arrive.
+"""
+
+import math
+from collections import deque
+
+# Unit vectors in map order (x, y), EQ +x is west and +y is north.
+_DIAGONAL = 1 / math.sqrt(2)
+HEADING_VECTORS = {
+    "North": (0.0, 1.0),
+    "NorthEast": (-_DIAGONAL, _DIAGONAL),
+    "East": (-1.0, 0.0),
+    "SouthEast": (-_DIAGONAL, -_DIAGONAL),
+    "South": (0.0, -1.0),
+    "SouthWest": (_DIAGONAL, -_DIAGONAL),
+    "West": (1.0, 0.0),
+    "NorthWest": (_DIAGONAL, _DIAGONAL),
+}
+
+# Samples closer together than this are too noisy for a velocity, /loc
+# macros often print several locs in the same second.
+MIN_SAMPLE_INTERVAL = 0.5
+# Samples further apart than this say nothing about current movement.
+MAX_SAMPLE_INTERVAL = 10.0
+# Faster than any run speed buff, anything above is a teleport or zone.
+MAX_SPEED = 100.0
+
+
+class MotionEstimator:
+    """Estimate the position of one character at any time from its locs."""
+
+    def __init__(self, max_extrapolation=5.0, history=8):
+        self.max_extrapolation = max_extrapolation
+        self.samples = deque(maxlen=history)
+        self.velocity = None
+        self.heading = None
+        self.heading_time = None
+        # Difference between receive time and log time of the last sample.
+        self.clock_offset = 0.0
+
+    def reset(self):
+        """Forget all samples, for example after zoning."""
+        self.samples.clear()
+        self.velocity = None
+        self.heading = None
+        self.heading_time = None
+
+    def add_loc(self, t, loc, received=None):
+        """Add a loc sample logged at time t, received at time received."""
+        self.samples.append((t, loc))
+        self.clock_offset = 0.0 if received is None else received - t
+        self.velocity = self._velocity()
+
+    def add_heading(self, t, heading):
+        """Add a sensed compass heading name at time t, unknown names are ignored."""
+        vector = HEADING_VECTORS.get(heading)
+        if vector is not None:
+            self.heading = vector
+            self.heading_time = t
+
+    def _velocity(self):
+        """Return the (x, y) velocity from the newest and a suitable older sample."""
+        t1, (x1, y1, _) = self.samples[-1]
+        for t0, (x0, y0, _) in reversed(self.samples):
+            dt = t1 - t0
+            if dt < MIN_SAMPLE_INTERVAL:
+                continue
+            if dt > MAX_SAMPLE_INTERVAL:
+                return None
+            velocity = ((x1 - x0) / dt, (y1 - y0) / dt)
+            if math.hypot(*velocity) > MAX_SPEED:
+                return None
+            return velocity
+        return None
+
+    def estimate(self, t):
+        """Return the estimated (x, y, z) at receive time t and if extrapolated.
+
+        The loc is None when there are no samples, and extrapolated is only
+        True when the loc differs from the last sample.
+        """
+        if not self.samples:
+            return None, False
+        t -= self.clock_offset
+        last_t, (x, y, z) = self.samples[-1]
+        elapsed = min(t - last_t, self.max_extrapolation)
+        if elapsed <= 0:
+            return (x, y, z), False
+        velocity = self._current_velocity(last_t)
+        if velocity is None:
+            return (x, y, z), False
+        return (x + velocity[0] * elapsed, y + velocity[1] * elapsed, z), True
+
+    def moving(self, t):
+        """Return whether the estimate can still change after receive time t."""
+        if not self.samples:
+            return False
+        last_t, _ = self.samples[-1]
+        if t - self.clock_offset - last_t >= self.max_extrapolation:
+            return False
+        return self._current_velocity(last_t) is not None
+
+    def _current_velocity(self, last_t):
+        """Return the velocity to extrapolate with, or None if not moving."""
+        velocity = self.velocity
+        if self.heading is not None and self.heading_time >= last_t:
+            # Sensed heading is newer than the last loc, turn onto it.
+            speed = math.hypot(*velocity) if velocity is not None else 0.0
+            velocity = (self.heading[0] * speed, self.heading[1] * speed)
+        if velocity is None or velocity == (0.0, 0.0):
+            return None
+        return velocity
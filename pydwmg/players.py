@@ -0,0 +1,148 @@
+"""Position tracking for many characters at once, for the shared map.
+
+Feeds for each character (local logs or frames recorded from the tracking
+service) update a PlayerTracker. Map position and heading for a player are only
+recalculated when their feed has changed, so drawing a frame with many
+idle players costs little more than iterating over them.
+"""
+
+import json
+
+from pydwmg.events import LOC, ZONE
+from pydwmg.geometry import clamp_to_map, eq_to_map, heading_vector
+from pydwmg.service import frame_event
+from pydwmg.zones import find_zone
+
+# Set marker sizes to odd numbers so shape is even around center pixel.
+PLAYER_MARKER_SIZE = 7
+PLAYER_ARROW_SIZE = 7
+
+
+class PlayerState:
+    """Last known zone and locs of one character and its cached map geometry."""
+
+    __slots__ = (
+        "name",
+        "zone",
+        "zone_name",
+        "loc",
+        "prev_loc",
+        "changed",
+        "map_point",
+        "heading",
+    )
+
+    def __init__(self, name):
+        self.name = name
+        self.zone = None
+        # Name of the zone, known even when it has no map in zone_info.
+        self.zone_name = None
+        self.loc = None
+        self.prev_loc = None
+        self.changed = True
+        self.map_point = None
+        self.heading = None
+
+    def __repr__(self):
+        return f"PlayerState({self.name}, {self.zone}, {self.loc})"
+
+
+class PlayerTracker:
+    """Hold the latest state of every followed character."""
+
+    def __init__(self, zones):
+        self.zones = zones
+        self.players = {}
+        # Set whenever any player changes, cleared by whoever draws them.
+        self.dirty = False
+        self._map_size = None
+
+    def player(self, name):
+        try:
+            return self.players[name]
+        except KeyError:
+            player = self.players[name] = PlayerState(name)
+            return player
+
+    def update_zone(self, name, zone_text):
+        player = self.player(name)
+        player.zone = find_zone(self.zones, zone_text)
+        player.zone_name = zone_text if player.zone is None else player.zone.zone_name
+        # Locs are no longer valid after zoning.
+        player.loc = player.prev_loc = None
+        player.changed = self.dirty = True
+
+    def update_loc(self, name, loc):
+        player = self.player(name)
+        if loc == player.loc:
+            return
+        player.prev_loc = player.loc
+        player.loc = loc
+        player.changed = self.dirty = True
+
+    def handle_event(self, name, kind, value):
+        """Update a player from a classified (kind, value) event."""
+        if kind == ZONE:
+            self.update_zone(name, value)
+        elif kind == LOC:
+            self.update_loc(name, value)
+
+    def take_dirty(self):
+        """Return whether anything changed since the last call."""
+        dirty = self.dirty
+        self.dirty = False
+        return dirty
+
+    def markers(self, zone, map_width, map_height):
+        """Return players with a loc in zone, with up to date map geometry."""
+        if self._map_size != (map_width, map_height):
+            # A new map invalidates every cached position.
+            self._map_size = (map_width, map_height)
+            for player in self.players.values():
+                player.changed = True
+        markers = []
+        for player in self.players.values():
+            if player.zone is not zone or player.loc is None:
+                continue
+            if player.changed:
+                self._update_geometry(player, map_width, map_height)
+            markers.append(player)
+        return markers
+
+    def _update_geometry(self, player, map_width, map_height):
+        zone = player.zone
+        new_point = eq_to_map(zone, *player.loc[:2])
+        prev_point = None
+        if player.prev_loc is not None:
+            prev_point = eq_to_map(zone, *player.prev_loc[:2])
+        new_x, new_y = new_point
+        if not (0 < new_x < map_width and 0 < new_y < map_height):
+            new_point, prev_point = clamp_to_map(
+                new_point, prev_point, map_width, map_height, PLAYER_MARKER_SIZE
+            )
+        player.map_point = new_point
+        player.heading = None
+        if prev_point is not None:
+            player.heading = heading_vector(prev_point, new_point)
+        player.changed = False
+
+
+def read_feed(filename):
+    """Yield (src, Event) pairs from a recorded service feed file."""
+    with open(filename, "rt") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                frame = json.loads(line)
+            except ValueError:
+                continue
+            # Valid JSON that is not a frame is skipped like malformed lines.
+            if not isinstance(frame, dict):
+                continue
+            try:
+                event = frame_event(frame)
+            except (KeyError, TypeError, ValueError):
+                continue
+            if event is not None:
+                yield event
@@ -0,0 +1,347 @@
+"""Points of interest per zone with nearest neighbour and radius queries.
+
+Points are kept in the same EQ coordinate space as locs in map order, so
+anything that can be drawn with geometry.eq_to_map can be indexed. Each
+category of point (zone lines, camps, guild members...) has its own
+uniform grid index, so "nearest X to me" only looks at points of kind X.
+
+Static points are loaded from poi_info.csv, which lists locs in the order
+/loc prints them (y before x) so they can be pasted straight from a log.
+Moving entities are updated in place, which only moves them between grid
+cells.
+"""
+
+import csv
+import heapq
+import math
+from collections import namedtuple
+
+import numpy as np
+
+POI_INFO_FILE = "poi_info.csv"
+
+# Categories the map window looks up, data files may add others.
+ZONE_LINE = "zone_line"
+GUILD = "guild"
+
+# Zones are a few thousand units across, this keeps cells to a handful of
+# points for typical densities.
+DEFAULT_CELL_SIZE = 100.0
+# Indexes this small are searched by brute force, which beats walking
+# mostly empty rings of cells.
+BRUTE_FORCE_POINTS = 64
+
+POI = namedtuple("POI", ["name", "category", "x", "y"])
+
+
+class SpatialIndex:
+    """Uniform grid over 2D points, with O(1) insert, move and remove.
+
+    Coordinates live in growable NumPy arrays indexed by slot, and each grid
+    cell holds the set of slots inside it.
+    """
+
+    def __init__(self, cell_size=DEFAULT_CELL_SIZE, capacity=64):
+        self.cell_size = cell_size
+        self.xs = np.zeros(capacity)
+        self.ys = np.zeros(capacity)
+        self.keys = [None] * capacity
+        self.cells = {}
+        self.slots = {}
+        self._free = list(range(capacity - 1, -1, -1))
+        # Bounds of occupied cells, so searches know when to stop. Emptying
+        # a cell on the edge only marks them stale, they are refound when
+        # next searched.
+        self._min_cell = self._max_cell = None
+        self._bounds_stale = False
+
+    def __len__(self):
+        return len(self.slots)
+
+    def __contains__(self, key):
+        return key in self.slots
+
+    def _cell(self, x, y):
+        return (math.floor(x / self.cell_size), math.floor(y / self.cell_size))
+
+    def _grow(self):
+        capacity = len(self.xs)
+        self.xs = np.concatenate([self.xs, np.zeros(capacity)])
+        self.ys = np.concatenate([self.ys, np.zeros(capacity)])
+        self.keys.extend([None] * capacity)
+        self._free.extend(range(2 * capacity - 1, capacity - 1, -1))
+
+    def _track_bounds(self, cell):
+        if self._min_cell is None:
+            self._min_cell = self._max_cell = cell
+            return
+        self._min_cell = (
+            min(self._min_cell[0], cell[0]),
+            min(self._min_cell[1], cell[1]),
+        )
+        self._max_cell = (
+            max(self._max_cell[0], cell[0]),
+            max(self._max_cell[1], cell[1]),
+        )
+
+    def insert(self, key, x, y):
+        """Add a point, or move it if key is already indexed."""
+        if key in self.slots:
+            self.move(key, x, y)
+            return
+        if not self._free:
+            self._grow()
+        slot = self._free.pop()
+        self.slots[key] = slot
+        self.keys[slot] = key
+        self.xs[slot] = x
+        self.ys[slot] = y
+        cell = self._cell(x, y)
+        self.cells.setdefault(cell, set()).add(slot)
+        self._track_bounds(cell)
+
+    def insert_many(self, keys, xs, ys):
+        """Add many points at once, cells are worked out in one NumPy pass.
+
+        Keys already indexed, or repeated in keys, are moved as insert does.
+        """
+        keys = list(keys)
+        xs = np.asarray(xs, dtype=np.float64)
+        ys = np.asarray(ys, dtype=np.float64)
+        new = []
+        moves = []
+        for i, key in enumerate(keys):
+            if key in self.slots:
+                moves.append(i)
+            else:
+                # Claimed now so a repeat later in keys is moved instead.
+                self.slots[key] = None
+                new.append(i)
+        if moves:
+            moved = [(keys[i], xs[i], ys[i]) for i in moves]
+            keys = [keys[i] for i in new]
+            xs = xs[new]
+            ys = ys[new]
+        while len(self._free) < len(keys):
+            self._grow()
+        cell_xs = np.floor(xs / self.cell_size).astype(np.int64)
+        cell_ys = np.floor(ys / self.cell_size).astype(np.int64)
+        slots = [self._free.pop() for _ in range(len(keys))]
+        self.xs[slots] = xs
+        self.ys[slots] = ys
+        cells = self.cells
+        for key, slot, cell in zip(
+            keys, slots, zip(cell_xs.tolist(), cell_ys.tolist())
+        ):
+            self.slots[key] = slot
+            self.keys[slot] = key
+            cells.setdefault(cell, set()).add(slot)
+        if len(keys):
+            self._track_bounds((int(cell_xs.min()), int(cell_ys.min())))
+            self._track_bounds((int(cell_xs.max()), int(cell_ys.max())))
+        if moves:
+            for key, x, y in moved:
+                self.move(key, x, y)
+
+    def move(self, key, x, y):
+        """Update the position of an indexed point."""
+        slot = self.slots[key]
+        old_cell = self._cell(self.xs[slot], self.ys[slot])
+        self.xs[slot] = x
+        self.ys[slot] = y
+        cell = self._cell(x, y)
+        if cell != old_cell:
+            self._discard_from_cell(old_cell, slot)
+            self.cells.setdefault(cell, set()).add(slot)
+            self._track_bounds(cell)
+
+    def remove(self, key):
+        slot = self.slots.pop(key)
+        self._discard_from_cell(self._cell(self.xs[slot], self.ys[slot]), slot)
+        self.keys[slot] = None
+        self._free.append(slot)
+
+    def _discard_from_cell(self, cell, slot):
+        members = self.cells[cell]
+        members.discard(slot)
+        if not members:
+            del self.cells[cell]
+            if cell[0] in (self._min_cell[0], self._max_cell[0]) or cell[1] in (
+                self._min_cell[1],
+                self._max_cell[1],
+            ):
+                self._bounds_stale = True
+
+    def _bounds(self):
+        """Return the min and max occupied cells, refinding them if stale."""
+        if self._bounds_stale:
+            self._bounds_stale = False
+            cells = np.array(list(self.cells), dtype=np.int64).reshape(-1, 2)
+            if len(cells):
+                self._min_cell = tuple(cells.min(axis=0).tolist())
+                self._max_cell = tuple(cells.max(axis=0).tolist())
+            else:
+                self._min_cell = self._max_cell = None
+        return self._min_cell, self._max_cell
+
+    def position(self, key):
+        slot = self.slots[key]
+        return (float(self.xs[slot]), float(self.ys[slot]))
+
+    def _ring(self, cell_x, cell_y, ring):
+        """Yield the slots in the square ring of cells ring steps out."""
+        cells = self.cells
+        if ring == 0:
+            yield from cells.get((cell_x, cell_y), ())
+            return
+        for dx in range(-ring, ring + 1):
+            yield from cells.get((cell_x + dx, cell_y - ring), ())
+            yield from cells.get((cell_x + dx, cell_y + ring), ())
+        for dy in range(-ring + 1, ring):
+            yield from cells.get((cell_x - ring, cell_y + dy), ())
+            yield from cells.get((cell_x + ring, cell_y + dy), ())
+
+    def _distances(self, slots, x, y):
+        slots = np.fromiter(slots, dtype=np.intp, count=len(slots))
+        return slots, np.hypot(self.xs[slots] - x, self.ys[slots] - y)
+
+    def _k_nearest(self, slots, x, y, k):
+        """Return the k (distance, slot) pairs of slots closest to x, y, sorted."""
+        slots, distances = self._distances(slots, x, y)
+        if len(slots) > k:
+            order = np.argpartition(distances, k - 1)[:k]
+            slots, distances = slots[order], distances[order]
+        return sorted(zip(distances.tolist(), slots.tolist()))
+
+    def nearest(self, x, y, k=1):
+        """Return up to k (distance, key) pairs nearest to x, y, closest first."""
+        if not self.slots or k <= 0:
+            return []
+        if len(self.slots) <= BRUTE_FORCE_POINTS:
+            best = self._k_nearest(list(self.slots.values()), x, y, k)
+            return [(distance, self.keys[slot]) for distance, slot in best]
+        cell_x, cell_y = self._cell(x, y)
+        min_cell, max_cell = self._bounds()
+        # Rings beyond this cannot contain any points.
+        max_ring = max(
+            abs(cell_x - min_cell[0]),
+            abs(cell_x - max_cell[0]),
+            abs(cell_y - min_cell[1]),
+            abs(cell_y - max_cell[1]),
+        )
+        # Once the rings have looked up as many cells as are occupied,
+        # sparse points are cheaper to check one by one.
+        lookups = len(self.cells)
+        candidates = []
+        best = None
+        for ring in range(max_ring + 1):
+            lookups -= max(8 * ring, 1)
+            if lookups < 0:
+                break
+            candidates.extend(self._ring(cell_x, cell_y, ring))
+            if len(candidates) < k:
+                continue
+            best = self._k_nearest(candidates, x, y, k)
+            # Anything in further rings is at least ring cells away.
+            if best[-1][0] <= ring * self.cell_size or ring == max_ring:
+                break
+            best = None
+        if best is None:
+            best = self._k_nearest(list(self.slots.values()), x, y, k)
+        return [(distance, self.keys[slot]) for distance, slot in best]
+
+    def within(self, x, y, radius):
+        """Return (distance, key) pairs within radius of x, y, closest first."""
+        if not self.slots:
+            return []
+        min_x, min_y = self._cell(x - radius, y - radius)
+        max_x, max_y = self._cell(x + radius, y + radius)
+        cells = self.cells
+        candidates = []
+        for cell_x in range(min_x, max_x + 1):
+            for cell_y in range(min_y, max_y + 1):
+                candidates.extend(cells.get((cell_x, cell_y), ()))
+        if not candidates:
+            return []
+        slots, distances = self._distances(candidates, x, y)
+        inside = distances <= radius
+        found = zip(distances[inside].tolist(), slots[inside].tolist())
+        return [(distance, self.keys[slot]) for distance, slot in sorted(found)]
+
+
+class ZonePOIs:
+    """Points of interest of one zone, indexed separately by category."""
+
+    def __init__(self, cell_size=DEFAULT_CELL_SIZE):
+        self.cell_size = cell_size
+        self.indexes = {}
+        self.pois = {}
+
+    def index(self, category):
+        try:
+            return self.indexes[category]
+        except KeyError:
+            index = self.indexes[category] = SpatialIndex(self.cell_size)
+            return index
+
+    def add(self, poi):
+        """Add a point, or move it if one with the same name and category exists."""
+        self.pois[(poi.category, poi.name)] = poi
+        self.index(poi.category).insert(poi.name, poi.x, poi.y)
+
+    def update(self, name, category, x, y):
+        """Add or move a moving entity such as a guild member."""
+        self.add(POI(name, category, x, y))
+
+    def remove(self, name, category):
+        if self.pois.pop((category, name), None) is not None:
+            self.indexes[category].remove(name)
+
+    def nearest(self, x, y, k=1, category=None):
+        """Return up to k (distance, POI) pairs nearest x, y, closest first."""
+        categories = self.indexes if category is None else [category]
+        found = []
+        for category in categories:
+            index = self.indexes.get(category)
+            if index is not None:
+                found.extend(
+                    (distance, category, name)
+                    for distance, name in index.nearest(x, y, k)
+                )
+        return [
+            (distance, self.pois[(category, name)])
+            for distance, category, name in heapq.nsmallest(k, found)
+        ]
+
+    def within(self, x, y, radius, category=None):
+        """Return (distance, POI) pairs within radius of x, y, closest first."""
+        categories = self.indexes if category is None else [category]
+        found = []
+        for category in categories:
+            index = self.indexes.get(category)
+            if index is not None:
+                found.extend(
+                    (distance, category, name)
+                    for distance, name in index.within(x, y, radius)
+                )
+        found.sort()
+        return [
+            (distance, self.pois[(category, name)])
+            for distance, category, name in found
+        ]
+
+
+def load_pois(poi_info_file=POI_INFO_FILE):
+    """Return a dict of zone name to ZonePOIs read from the POI csv."""
+    zone_pois = {}
+    with open(poi_info_file, newline="") as f:
+        poi_csv = csv.reader(f)
+        next(poi_csv)  # Skip first line
+        for zone_name, poi_name, category, loc_y, loc_x in poi_csv:
+            if zone_name not in zone_pois:
+                zone_pois[zone_name] = ZonePOIs()
+            # Stored in /loc order, indexed in map order like other locs.
+            zone_pois[zone_name].add(
+                POI(poi_name, category, float(loc_x), float(loc_y))
+            )
+    return zone_pois
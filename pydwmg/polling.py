@@ -0,0 +1,96 @@
+"""Adaptive poll intervals for log tailing and log folder scanning.
+
+A PollSchedule starts at its fast interval and doubles the wait after
+every poll that finds nothing, up to max_interval. Any activity snaps it
+straight back to the fast interval. Once nothing has happened for
+idle_after seconds it drops to idle_interval, so a map left open while
+the game is closed only wakes a few times a minute.
+
+Each poll calls either activity(), when it found something, or
+next_interval() for how long to sleep, so together they count every
+wakeup.
+"""
+
+import logging
+import time
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+BACKOFF_FACTOR = 2.0
+# Seconds without activity before polling drops to the idle interval.
+IDLE_AFTER = 300.0
+IDLE_INTERVAL = 10.0
+
+
+class PollSchedule:
+    """Decides how long to wait before the next poll."""
+
+    def __init__(
+        self,
+        interval,
+        max_interval,
+        idle_after=IDLE_AFTER,
+        idle_interval=IDLE_INTERVAL,
+        backoff=BACKOFF_FACTOR,
+        name="poll",
+        clock=time.monotonic,
+    ):
+        self.interval = interval
+        self.max_interval = max_interval
+        self.idle_after = idle_after
+        self.idle_interval = idle_interval
+        self.backoff = backoff
+        self.name = name
+        self.clock = clock
+        self.current = interval
+        self.last_activity = clock()
+        self.idle = False
+        self.wakeups = 0
+        # Wakeup times within the last minute.
+        self._recent = deque()
+
+    def activity(self):
+        """Note that the last poll found something, polling fast again."""
+        self.current = self.interval
+        self.last_activity = self._wakeup()
+        if self.idle:
+            self.idle = False
+            logger.info("%s: activity, polling every %gs", self.name, self.interval)
+
+    def next_interval(self):
+        """Return seconds to wait after a poll that found nothing."""
+        now = self._wakeup()
+        if now - self.last_activity >= self.idle_after:
+            if not self.idle:
+                self.idle = True
+                logger.info(
+                    "%s: idle for %.0fs, polling every %gs"
+                    " (%d wakeups in the last minute)",
+                    self.name,
+                    now - self.last_activity,
+                    self.idle_interval,
+                    self.wakeups_per_minute(),
+                )
+            return self.idle_interval
+        interval = self.current
+        self.current = min(self.current * self.backoff, self.max_interval)
+        return interval
+
+    def wakeups_per_minute(self):
+        """Return the number of polls in the last minute."""
+        self._trim(self.clock())
+        return len(self._recent)
+
+    def _wakeup(self):
+        """Count a poll, returning the time it happened."""
+        now = self.clock()
+        self.wakeups += 1
+        self._recent.append(now)
+        self._trim(now)
+        return now
+
+    def _trim(self, now):
+        recent = self._recent
+        while recent and now - recent[0] > 60:
+            recent.popleft()
@@ -0,0 +1,183 @@
+"""Zone to zone route planning across the zone line graph.
+
+Zone lines are the nodes of the graph, each one being an exit from one zone
+into another. Taking an exit lands you at the matching exit back the other
+way, and walking between two exits in a zone costs their distance in EQ
+units. Exits with no measured loc cost UNKNOWN_LEG_COST to walk to or from.
+
+Routes are planned backwards from the target zone, giving the cost from
+every exit in the world to each way into the target zone. These tables are
+cached by target zone, so a route from a new position only has to add the
+walk to each exit of the current zone, and the walk from each way in to a
+target player.
+"""
+
+import csv
+import heapq
+import math
+from collections import OrderedDict, namedtuple
+
+ZONE_LINES_FILE = "zone_lines.csv"
+
+# Walking cost of a leg with an unmeasured end, about one zone crossing.
+UNKNOWN_LEG_COST = 3000.0
+# Cost of zoning itself, so fewer zones wins between similar routes.
+ZONE_LINE_COST = 500.0
+# Number of target zones whose cost tables are kept.
+ROUTE_CACHE_SIZE = 32
+
+ZoneLine = namedtuple("ZoneLine", ["zone_name", "to_zone_name", "x", "y"])
+ZoneLine.__doc__ = """An exit from one zone to another, x and y None if unmeasured."""
+
+Route = namedtuple("Route", ["cost", "zone_lines", "waypoint"])
+Route.__doc__ = """A planned route, waypoint is the next (x, y) to head for."""
+
+
+def leg_cost(start, end):
+    """Return the walking cost between two (x, y) points, either may be None."""
+    if start is None or end is None:
+        return UNKNOWN_LEG_COST
+    return math.hypot(end[0] - start[0], end[1] - start[1])
+
+
+class ZoneGraph:
+    """Exits of every zone keyed by zone name, and where each one lands."""
+
+    def __init__(self, zone_lines):
+        self.zone_lines = list(zone_lines)
+        self.exits = {}
+        self.entries = {}
+        for index, zone_line in enumerate(self.zone_lines):
+            self.exits.setdefault(zone_line.zone_name, []).append(index)
+            self.entries.setdefault(zone_line.to_zone_name, []).append(index)
+        self.points = [
+            None if zone_line.x is None else (zone_line.x, zone_line.y)
+            for zone_line in self.zone_lines
+        ]
+        # Arrival point of each exit is the exit back the other way.
+        back = {
+            (zone_line.zone_name, zone_line.to_zone_name): index
+            for index, zone_line in enumerate(self.zone_lines)
+        }
+        self.arrivals = []
+        for zone_line in self.zone_lines:
+            back_index = back.get((zone_line.to_zone_name, zone_line.zone_name))
+            self.arrivals.append(
+                None if back_index is None else self.points[back_index]
+            )
+
+    def __contains__(self, zone_name):
+        return zone_name in self.exits or zone_name in self.entries
+
+    def zone_names(self):
+        return sorted(self.exits.keys() | self.entries.keys())
+
+    def costs_to_entry(self, entry):
+        """Return cost and next exit tables from every exit to taking entry.
+
+        A reverse Dijkstra search from the entry exit, the cost includes
+        zoning through the entry itself. Routes never pass through the
+        target zone, as any way into it already arrives there.
+        """
+        target_zone_name = self.zone_lines[entry].to_zone_name
+        costs = {entry: ZONE_LINE_COST}
+        next_exits = {entry: None}
+        queue = [(ZONE_LINE_COST, entry)]
+        points = self.points
+        arrivals = self.arrivals
+        while queue:
+            cost, index = heapq.heappop(queue)
+            if cost > costs[index]:
+                continue
+            point = points[index]
+            # Any exit landing in this exit's zone can lead to it.
+            for previous in self.entries.get(self.zone_lines[index].zone_name, ()):
+                if self.zone_lines[previous].zone_name == target_zone_name:
+                    continue
+                new_cost = cost + ZONE_LINE_COST + leg_cost(arrivals[previous], point)
+                if new_cost < costs.get(previous, math.inf):
+                    costs[previous] = new_cost
+                    next_exits[previous] = index
+                    heapq.heappush(queue, (new_cost, previous))
+        return costs, next_exits
+
+
+def load_zone_graph(zone_lines_file=ZONE_LINES_FILE):
+    """Return a ZoneGraph read from the zone lines csv."""
+    zone_lines = []
+    with open(zone_lines_file, newline="") as f:
+        zone_lines_csv = csv.reader(f)
+        next(zone_lines_csv)  # Skip first line
+        for zone_name, to_zone_name, loc_y, loc_x in zone_lines_csv:
+            x = y = None
+            if loc_x and loc_y:
+                # Stored in /loc order, kept in map order like other locs.
+                x, y = float(loc_x), float(loc_y)
+            zone_lines.append(ZoneLine(zone_name, to_zone_name, x, y))
+    return ZoneGraph(zone_lines)
+
+
+class RoutePlanner:
+    """Plan routes over a ZoneGraph, caching the work for each target zone."""
+
+    def __init__(self, graph, cache_size=ROUTE_CACHE_SIZE):
+        self.graph = graph
+        self.cache_size = cache_size
+        self._tables = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def tables(self, target_zone_name):
+        """Return (entry, costs, next_exits) for every way into a zone."""
+        try:
+            tables = self._tables[target_zone_name]
+        except KeyError:
+            self.misses += 1
+            tables = [
+                (entry, *self.graph.costs_to_entry(entry))
+                for entry in self.graph.entries.get(target_zone_name, ())
+            ]
+            self._tables[target_zone_name] = tables
+            if len(self._tables) > self.cache_size:
+                self._tables.popitem(last=False)
+            return tables
+        self.hits += 1
+        self._tables.move_to_end(target_zone_name)
+        return tables
+
+    def route(self, zone_name, loc, target_zone_name, target_loc=None):
+        """Return the cheapest Route to a target zone, or loc in it, or None.
+
+        loc and target_loc are (x, y, ...) locs in map order, or None if
+        not known.
+        """
+        start = None if loc is None else (loc[0], loc[1])
+        target = None if target_loc is None else (target_loc[0], target_loc[1])
+        if zone_name == target_zone_name:
+            if target is None:
+                return Route(0.0, [], None)
+            return Route(leg_cost(start, target), [], target)
+        graph = self.graph
+        best_cost = math.inf
+        best = None
+        for entry, costs, next_exits in self.tables(target_zone_name):
+            final_leg = 0.0
+            if target is not None:
+                final_leg = leg_cost(graph.arrivals[entry], target)
+            for index in graph.exits.get(zone_name, ()):
+                cost = costs.get(index)
+                if cost is None:
+                    continue
+                cost += leg_cost(start, graph.points[index]) + final_leg
+                if cost < best_cost:
+                    best_cost = cost
+                    best = (index, next_exits)
+        if best is None:
+            return None
+        first, next_exits = best
+        zone_lines = []
+        index = first
+        while index is not None:
+            zone_lines.append(graph.zone_lines[index])
+            index = next_exits[index]
+        return Route(best_cost, zone_lines, graph.points[first])
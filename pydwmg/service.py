@@ -0,0 +1,296 @@
+"""Headless tracking service publishing log events to socket subscribers.
+
+Each followed log file is a source named after the character in its file
+name. Events are sent to every subscriber as newline delimited JSON
+frames, with the log time as epoch seconds in ts, for example::
+
+    {"src": "Soandso", "type": "loc", "x": 127.82, "y": 1029.46, "z": 3.75,
+     "ts": 1610403113.0, "seq": 12}
+
+Zone and who frames are queued in order for each subscriber, but only the
+latest loc per source is kept while a subscriber is behind, so a slow
+client skips stale positions instead of growing an unbounded backlog. A
+subscriber that falls more than max_queue ordered frames behind is
+disconnected.
+"""
+
+import asyncio
+import json
+import logging
+import math
+import re
+from pathlib import Path
+
+from pydwmg.events import HEADING, LOC, WHO, ZONE, Event, classify_line
+from pydwmg.logfile import LogTailer, find_starting_zone
+from pydwmg.tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 7399
+
+LOGFILE_NAME_PATTERN = re.compile(r"^eqlog_([^_]+)_")
+
+
+def source_name(logfile):
+    """Return the character name from an eqlog_<name>_<server>.txt path."""
+    stem = Path(logfile).name
+    match = LOGFILE_NAME_PATTERN.match(stem)
+    if match is None:
+        return Path(logfile).stem
+    return match.group(1)
+
+
+def event_frame(src, kind, value, timestamp=None):
+    """Return the JSON serialisable frame for a classified log event."""
+    frame = {"src": src, "type": kind}
+    if kind == LOC:
+        frame["x"], frame["y"], frame["z"] = value
+    elif kind == ZONE:
+        frame["zone"] = value
+    elif kind == HEADING:
+        frame["heading"] = value
+    elif kind == WHO:
+        frame["name"], frame["level"], frame["class"], frame["guild"] = value
+    if timestamp is not None:
+        frame["ts"] = timestamp
+    return frame
+
+
+def _number(frame, key):
+    """Return a frame field as a finite float, raising ValueError if not one."""
+    number = float(frame[key])
+    if not math.isfinite(number):
+        raise ValueError(f"{key} is not finite")
+    return number
+
+
+def _text(frame, key):
+    """Return a frame field that must be a string, raising TypeError if not."""
+    text = frame[key]
+    if not isinstance(text, str):
+        raise TypeError(f"{key} is not a string")
+    return text
+
+
+def frame_event(frame):
+    """Return the (src, Event) pair for a tracking service frame, or None.
+
+    Frames without a ts get None as the event time. Fields of the wrong
+    type raise KeyError, TypeError or ValueError, so frames from a file or
+    socket never hand the window a loc it cannot draw.
+    """
+    kind = frame.get("type")
+    if kind == LOC:
+        value = (_number(frame, "x"), _number(frame, "y"), _number(frame, "z"))
+    elif kind == ZONE:
+        value = _text(frame, "zone")
+    elif kind == HEADING:
+        value = _text(frame, "heading")
+    elif kind == WHO:
+        value = (
+            _text(frame, "name"),
+            frame["level"],
+            frame["class"],
+            frame["guild"],
+        )
+    else:
+        return None
+    timestamp = None if frame.get("ts") is None else _number(frame, "ts")
+    return (_text(frame, "src"), Event(timestamp, kind, value))
+
+
+def encode_frame(frame):
+    return json.dumps(frame, separators=(",", ":")).encode() + b"\n"
+
+
+class Subscriber:
+    """A connected client and the frames waiting to be written to it."""
+
+    def __init__(self, writer, max_queue):
+        self.writer = writer
+        self.max_queue = max_queue
+        self.ordered = []
+        self.latest_locs = {}
+        self.frames_sent = 0
+        self.locs_dropped = 0
+        self.closed = False
+        self._ready = asyncio.Event()
+
+    def push(self, frame):
+        """Queue a frame, returning False if the subscriber is too far behind."""
+        if frame["type"] == LOC:
+            if frame["src"] in self.latest_locs:
+                self.locs_dropped += 1
+            self.latest_locs[frame["src"]] = frame
+        else:
+            if frame["type"] == ZONE:
+                # A loc from the previous zone is stale once the zone changes.
+                if self.latest_locs.pop(frame["src"], None) is not None:
+                    self.locs_dropped += 1
+            if len(self.ordered) >= self.max_queue:
+                return False
+            self.ordered.append(frame)
+        self._ready.set()
+        return True
+
+    async def run(self):
+        """Write queued frames until the connection closes."""
+        try:
+            while not self.closed:
+                await self._ready.wait()
+                self._ready.clear()
+                frames = self.ordered
+                self.ordered = []
+                frames.extend(self.latest_locs.values())
+                self.latest_locs = {}
+                if not frames:
+                    continue
+                self.writer.write(b"".join(encode_frame(f) for f in frames))
+                self.frames_sent += len(frames)
+                # Waiting here is the backpressure, new locs replace stale ones.
+                await self.writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            # Cancellation still propagates once the connection is closed.
+            self.close()
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            self._ready.set()
+            self.writer.close()
+
+
+class TrackingService:
+    """Tail log files and fan out their events to socket subscribers."""
+
+    def __init__(self, logfiles=(), poll_interval=0.1, max_queue=1000):
+        self.logfiles = [Path(logfile) for logfile in logfiles]
+        self.poll_interval = poll_interval
+        self.max_queue = max_queue
+        self.subscribers = set()
+        self.state = {}
+        self.seq = 0
+        self._servers = []
+        self._tasks = []
+
+    def publish(self, src, kind, value, timestamp=None):
+        """Send an event from a source to every subscriber."""
+        self.seq += 1
+        frame = event_frame(src, kind, value, timestamp)
+        frame["seq"] = self.seq
+        state = self.state.setdefault(src, {})
+        if kind == ZONE:
+            state.pop(LOC, None)
+            state.pop(HEADING, None)
+        if kind == WHO:
+            # Each /who line is a different player, keep the latest of each.
+            state.setdefault(WHO, {})[value[0]] = frame
+        else:
+            state[kind] = frame
+        for subscriber in list(self.subscribers):
+            if not subscriber.push(frame):
+                logger.warning(
+                    "Dropping subscriber that fell %d frames behind", self.max_queue
+                )
+                subscriber.close()
+                self.subscribers.discard(subscriber)
+
+    async def _handle_client(self, reader, writer):
+        subscriber = Subscriber(writer, self.max_queue)
+        # Start new subscribers with the last known state of every source.
+        for state in self.state.values():
+            if ZONE in state:
+                subscriber.push(state[ZONE])
+            for frame in state.get(WHO, {}).values():
+                subscriber.push(frame)
+            for kind in (HEADING, LOC):
+                if kind in state:
+                    subscriber.push(state[kind])
+        self.subscribers.add(subscriber)
+        hangup = asyncio.create_task(self._close_on_eof(reader, subscriber))
+        try:
+            await subscriber.run()
+        finally:
+            hangup.cancel()
+            self.subscribers.discard(subscriber)
+
+    async def _close_on_eof(self, reader, subscriber):
+        """Close a subscriber as soon as its client hangs up.
+
+        Clients never send anything, so without this a client that left
+        while the logs were quiet would only be noticed on the next write.
+        """
+        try:
+            while await reader.read(4096):
+                pass
+        except ConnectionError:
+            pass
+        subscriber.close()
+
+    async def _follow(self, logfile):
+        src = source_name(logfile)
+        # File reads run in a thread so they never stall subscriber writes.
+        starting_zone = await asyncio.to_thread(find_starting_zone, logfile)
+        if starting_zone is not None:
+            self.publish(src, ZONE, starting_zone)
+        with LogTailer(logfile) as tailer:
+            while True:
+                lines = await asyncio.to_thread(tailer.readlines)
+                if lines:
+                    with tracer.span("parse", src=src, lines=len(lines)):
+                        for line in lines:
+                            event = classify_line(line)
+                            if event is not None:
+                                self.publish(src, event.kind, event.value, event.time)
+                await asyncio.sleep(self.poll_interval)
+
+    async def start(self, host=DEFAULT_HOST, port=DEFAULT_PORT, unix_path=None):
+        """Start listening and following logs, returns the bound addresses.
+
+        Raises FileNotFoundError before listening if a log file is missing.
+        """
+        for logfile in self.logfiles:
+            if not logfile.is_file():
+                raise FileNotFoundError(f"log file not found: {logfile}")
+        if unix_path is not None:
+            server = await asyncio.start_unix_server(self._handle_client, unix_path)
+        else:
+            server = await asyncio.start_server(self._handle_client, host, port)
+        self._servers.append(server)
+        for logfile in self.logfiles:
+            task = asyncio.create_task(self._follow(logfile))
+            task.add_done_callback(self._follow_done)
+            self._tasks.append(task)
+        return [sock.getsockname() for sock in server.sockets]
+
+    def _follow_done(self, task):
+        """Report a log follower that died, stop() only cancels them."""
+        if task.cancelled() or task.exception() is None:
+            return
+        logger.error(
+            "Stopped following a log after an error", exc_info=task.exception()
+        )
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        for subscriber in list(self.subscribers):
+            subscriber.close()
+        for server in self._servers:
+            server.close()
+            await server.wait_closed()
+        self._servers = []
+
+    async def serve_forever(self, host=DEFAULT_HOST, port=DEFAULT_PORT, unix_path=None):
+        addresses = await self.start(host, port, unix_path)
+        logger.info("Tracking service listening on %s", addresses)
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await self.stop()
@@ -0,0 +1,203 @@
+"""Logging and span tracing shared by the window, workers and service.
+
+Every module logs to a child of the "pydwmg" logger. setup_logging hands
+records to a queue, and a background listener thread formats and writes
+them, so worker threads never block on stderr. Messages use logging's lazy
+%-formatting, so a disabled statement is only a level check.
+
+Spans time named operations such as parsing a batch of lines or drawing
+the map. The shared tracer is disabled by default, when a span is a single
+attribute check returning a reusable no-op context manager. Once enabled,
+finished spans are kept in memory and can be exported as Chrome trace JSON
+to open in chrome://tracing or Perfetto.
+"""
+
+import atexit
+import functools
+import json
+import logging
+import os
+import queue
+import sys
+import threading
+import time
+from collections import deque
+from logging.handlers import QueueHandler, QueueListener
+
+LOGGER_NAME = "pydwmg"
+LOG_FORMAT = "%(asctime)s %(levelname)s [%(threadName)s] %(name)s: %(message)s"
+
+# Most finished spans kept, the oldest are dropped after this.
+MAX_TRACE_EVENTS = 1_000_000
+
+_listener = None
+
+
+def setup_logging(level=None, stream=None):
+    """Send pydwmg log records through a queue to a background writer.
+
+    Safe to call again, which only changes the level. With no level the
+    current one is kept, or INFO if logging was not set up yet.
+    """
+    global _listener
+    logger = logging.getLogger(LOGGER_NAME)
+    if level is not None:
+        logger.setLevel(level)
+    elif _listener is None:
+        logger.setLevel(logging.INFO)
+    if _listener is not None:
+        return logger
+    log_queue = queue.SimpleQueue()
+    handler = logging.StreamHandler(sys.stderr if stream is None else stream)
+    handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    logger.addHandler(QueueHandler(log_queue))
+    logger.propagate = False
+    _listener = QueueListener(log_queue, handler)
+    _listener.start()
+    atexit.register(stop_logging)
+    return logger
+
+
+def stop_logging():
+    """Write out any queued records and stop the background writer."""
+    global _listener
+    if _listener is None:
+        return
+    _listener.stop()
+    _listener = None
+    logger = logging.getLogger(LOGGER_NAME)
+    for handler in list(logger.handlers):
+        if isinstance(handler, QueueHandler):
+            logger.removeHandler(handler)
+    logger.propagate = True
+
+
+class _NullSpan:
+    """Span used while tracing is disabled, does nothing."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Span:
+    """Times the block it wraps and records it with its tracer on exit."""
+
+    __slots__ = ("tracer", "name", "category", "args", "start")
+
+    def __init__(self, tracer, name, category, args):
+        self.tracer = tracer
+        self.name = name
+        self.category = category
+        self.args = args
+        self.start = None
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter_ns()
+        thread = threading.current_thread()
+        self.tracer.events.append(
+            (
+                self.name,
+                self.category,
+                self.start,
+                end,
+                thread.ident,
+                thread.name,
+                self.args,
+            )
+        )
+        return False
+
+
+class Tracer:
+    """Collects timed spans from any thread while enabled."""
+
+    def __init__(self, max_events=MAX_TRACE_EVENTS):
+        self.enabled = False
+        # Appending to a deque is atomic, so threads need no lock.
+        self.events = deque(maxlen=max_events)
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def clear(self):
+        self.events.clear()
+
+    def span(self, name, category=LOGGER_NAME, **args):
+        """Return a context manager timing a block as a span named name."""
+        if not self.enabled:
+            return _NULL_SPAN
+        return Span(self, name, category, args)
+
+    def chrome_trace(self):
+        """Return the recorded spans as a Chrome trace event dict."""
+        events = list(self.events)
+        if events:
+            origin = min(start for _, _, start, _, _, _, _ in events)
+        pid = os.getpid()
+        trace_events = []
+        thread_names = {}
+        for name, category, start, end, tid, thread_name, args in events:
+            thread_names[tid] = thread_name
+            trace_events.append(
+                {
+                    "name": name,
+                    "cat": category,
+                    "ph": "X",
+                    "ts": (start - origin) / 1000,
+                    "dur": (end - start) / 1000,
+                    "pid": pid,
+                    "tid": tid,
+                    "args": args,
+                }
+            )
+        for tid, thread_name in thread_names.items():
+            trace_events.append(
+                {
+                    "name": "thread_name",
+                    "ph": "M",
+                    "pid": pid,
+                    "tid": tid,
+                    "args": {"name": thread_name},
+                }
+            )
+        return {"traceEvents": trace_events, "displayTimeUnit": "ms"}
+
+    def export_chrome_trace(self, filename):
+        """Write the recorded spans to filename as Chrome trace JSON."""
+        with open(filename, "w") as f:
+            json.dump(self.chrome_trace(), f, default=str)
+        return len(self.events)
+
+
+tracer = Tracer()
+
+
+def traced(name, category=LOGGER_NAME):
+    """Decorate a function so each call is a span while tracing is enabled."""
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not tracer.enabled:
+                return func(*args, **kwargs)
+            with Span(tracer, name, category, {}):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,77 @@
+"""Zone registry loaded from zone_info.csv."""
+
+import csv
+
+ZONE_INFO_FILE = "zone_info.csv"
+ZONE_INFO_HEADER = [
+    "zone_name",
+    "map_filename",
+    "zone_who_name",
+    "zone_alpha_name",
+    "eq_grid_size",
+    "map_grid_size",
+    "offset_x",
+    "offset_y",
+]
+
+
+class Zone:
+    def __init__(self, zone_info):
+        (
+            self.zone_name,
+            self.map_filename,
+            self.zone_who_name,
+            self.zone_alpha_name,
+            self.eq_grid_size,
+            self.map_grid_size,
+            self.offset_x,
+            self.offset_y,
+        ) = zone_info
+        self.eq_grid_size = int(self.eq_grid_size)
+        # Calibrated maps can have a fractional grid size.
+        self.map_grid_size = float(self.map_grid_size)
+        self.map_scale_factor = self.eq_grid_size / self.map_grid_size
+        self.offset_x = float(self.offset_x)
+        self.offset_y = float(self.offset_y)
+
+    def __repr__(self):
+        return f"Zone({self.zone_name})"
+
+    def zone_info(self):
+        """Return the zone as a row of zone info csv values."""
+        return [
+            self.zone_name,
+            self.map_filename,
+            self.zone_who_name,
+            self.zone_alpha_name,
+            str(self.eq_grid_size),
+            f"{self.map_grid_size:g}",
+            f"{self.offset_x:.1f}",
+            f"{self.offset_y:.1f}",
+        ]
+
+
+def load_zones(zone_info_file=ZONE_INFO_FILE):
+    """Return a list of Zone objects read from the zone info csv."""
+    with open(zone_info_file, newline="") as f:
+        zone_csv = csv.reader(f)
+        next(zone_csv)  # Skip first line
+        return [Zone(zone_info) for zone_info in zone_csv]
+
+
+def save_zones(zones, zone_info_file=ZONE_INFO_FILE):
+    """Write Zone objects to a zone info csv in the order given."""
+    with open(zone_info_file, "w", newline="") as f:
+        zone_csv = csv.writer(f, lineterminator="\n")
+        zone_csv.writerow(ZONE_INFO_HEADER)
+        zone_csv.writerows(zone.zone_info() for zone in zones)
+
+
+def find_zone(zones, zone_text):
+    """Return the zone matching either its entered or /who name, or None."""
+    for zone in zones:
+        if zone.zone_name == zone_text:
+            return zone
+        elif zone.zone_who_name == zone_text:
+            return zone
+    return None
@@ -0,0 +1,133 @@
+"""Benchmark of log header parsing and line classification.
+
+Builds a synthetic log of a million lines, a realistic mix of chat,
+combat and mapping messages with a few lines per second of game time,
+checks parse_timestamp against time.strptime on every line and on headers
+around each month and year boundary, then times:
+
+* fixed slice header parsing (parse_timestamp) against time.strptime
+* classify_line against the previous "^\\[.*\\]" prefixed regexes
+
+Run from the repository root:
+    python tools/bench_events.py --lines 1000000
+"""
+
+import argparse
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from pydwmg.events import classify_line, parse_timestamp  # noqa: E402
+
+MESSAGES = [
+    "Soandso tells the guild, 'anyone up for Kedge Keep?'",
+    "You have been healed for 120 points of damage.",
+    "A gnoll pup hits YOU for 6 points of damage.",
+    "You slash a gnoll pup for 14 points of damage.",
+    "Your Location is 1029.46, 127.82, 3.75",
+    "Your Location is -286.33, 101.29, -4.09",
+    "You have entered Qeynos Hills.",
+    "You think you are heading SouthWest.",
+    "[60 Oracle] Soandso (Barbarian) <The Guild>",
+]
+WEIGHTS = [30, 15, 20, 20, 8, 4, 1, 1, 1]
+
+# The patterns used before the event model, for comparison.
+OLD_ZONE_PATTERN = re.compile(r"^\[.*\] You have entered ([\w\s']+)\.$")
+OLD_LOC_PATTERN = re.compile(
+    r"^\[.*\] Your Location is (\-?\d+\.\d+), (\-?\d+\.\d+), (\-?\d+\.\d+)$"
+)
+
+
+def synthetic_log(lines, seed=1):
+    rng = random.Random(seed)
+    start = time.mktime((2021, 1, 11, 22, 11, 53, 0, 0, -1))
+    log = []
+    now = start
+    for _ in range(lines):
+        now += rng.choice((0, 0, 0, 1))
+        header = time.strftime("[%a %b %d %H:%M:%S %Y] ", time.localtime(now))
+        message = rng.choices(MESSAGES, WEIGHTS)[0]
+        log.append(header + message)
+    return log
+
+
+def boundary_lines(years=(2020, 2021, 2022)):
+    """Return lines a few seconds either side of every month start."""
+    log = []
+    for year in years:
+        for month in range(1, 13):
+            month_start = time.mktime((year, month, 1, 0, 0, 0, 0, 0, -1))
+            for offset in range(-2, 3):
+                header = time.strftime(
+                    "[%a %b %d %H:%M:%S %Y] ", time.localtime(month_start + offset)
+                )
+                log.append(header + MESSAGES[0])
+    return log
+
+
+def check_timestamps(lines):
+    """Return the lines whose parse_timestamp differs from time.strptime."""
+    expected = {}
+    mismatches = []
+    for line in lines:
+        header = line[:26]
+        if header not in expected:
+            expected[header] = strptime_header(line)
+        if parse_timestamp(line) != expected[header]:
+            mismatches.append(line)
+    return mismatches
+
+
+def old_classify(line):
+    match = OLD_ZONE_PATTERN.match(line)
+    if match is not None:
+        return ("zone", match.group(1))
+    match = OLD_LOC_PATTERN.match(line)
+    if match is not None:
+        y, x, z = match.groups()
+        return ("loc", (float(x), float(y), float(z)))
+    return None
+
+
+def strptime_header(line):
+    return time.mktime(time.strptime(line[1:25], "%a %b %d %H:%M:%S %Y"))
+
+
+def rate(func, lines):
+    start = time.perf_counter()
+    for line in lines:
+        func(line)
+    elapsed = time.perf_counter() - start
+    return len(lines) / elapsed
+
+
+def main(args):
+    lines = synthetic_log(args.lines)
+    print(f"{len(lines):,} lines, {len(set(l[:26] for l in lines)):,} distinct seconds")
+    # Checked in order, so the per second and per hour caches are exercised
+    # as well as the uncached path.
+    checked = lines + boundary_lines()
+    mismatches = check_timestamps(checked)
+    if mismatches:
+        for line in mismatches[:10]:
+            print(f"parse_timestamp mismatch: {line[:26]}")
+        return 1
+    print(f"parse_timestamp matches strptime on {len(checked):,} lines")
+
+    sample = lines[: args.lines // 10]
+    print(f"header, strptime:      {rate(strptime_header, sample) / 1e6:6.2f}M lines/s")
+    print(f"header, parse_timestamp:{rate(parse_timestamp, lines) / 1e6:6.2f}M lines/s")
+    print(f"classify, old regexes: {rate(old_classify, lines) / 1e6:6.2f}M lines/s")
+    print(f"classify_line (+time): {rate(classify_line, lines) / 1e6:6.2f}M lines/s")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lines", type=int, default=1_000_000)
+    sys.exit(main(parser.parse_args()))
@@ -0,0 +1,65 @@
+"""Benchmark of heatmap binning, incremental updates and rendering.
+
+Bins 10 million random locs into a zone heatmap in large batches, then
+times single loc incremental updates and the cached blur and colour
+render.
+
+Run from the repository root:
+    python tools/bench_heatmap.py --points 10000000
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from pydwmg.heatmap import Heatmap, READ_BATCH  # noqa: E402
+from pydwmg.zones import find_zone, load_zones  # noqa: E402
+
+ZONE_NAME = "Qeynos Hills"
+MAP_SIZE = (324, 575)
+
+
+def main(args):
+    zone = find_zone(load_zones(), ZONE_NAME)
+    rng = np.random.default_rng(1)
+    # Spread locs across roughly the zone's map area in EQ coordinates.
+    span = max(MAP_SIZE) * zone.map_scale_factor
+    locs = rng.uniform(-span / 2, span / 2, size=(args.points, 2))
+
+    heatmap = Heatmap(zone, *MAP_SIZE)
+    start = time.perf_counter()
+    for offset in range(0, args.points, args.batch):
+        heatmap.add_locs(locs[offset : offset + args.batch])
+    elapsed = time.perf_counter() - start
+    print(f"binned {args.points:,} locs in batches of {args.batch:,}")
+    print(f"  {elapsed:.2f}s, {args.points / elapsed / 1e6:.1f}M locs/s")
+
+    single = locs[: args.single]
+    start = time.perf_counter()
+    for loc in single:
+        heatmap.add_locs(loc)
+    elapsed = time.perf_counter() - start
+    print(f"incremental single loc update: {elapsed / args.single * 1e6:.1f} us")
+
+    start = time.perf_counter()
+    heatmap.image()
+    render = time.perf_counter() - start
+    start = time.perf_counter()
+    heatmap.image()
+    cached = time.perf_counter() - start
+    print(
+        f"render (blur + colour): {render * 1e3:.2f} ms, cached: {cached * 1e6:.1f} us"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--points", type=int, default=10_000_000)
+    parser.add_argument("--batch", type=int, default=READ_BATCH * 16)
+    parser.add_argument("--single", type=int, default=10_000)
+    main(parser.parse_args())
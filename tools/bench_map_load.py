@@ -0,0 +1,145 @@
+"""Benchmark of zone map loading from JPEG against the memory mapped cache.
+
+Each way of loading runs in a fresh process, which loads the map of every
+zone in turn, timing each load, and keeps them all so the growth in
+resident memory per zone can be measured. The cache is built first if
+missing, see tools/optimize_maps.py.
+
+Run from the repository root:
+    python tools/bench_map_load.py --repeat 5
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import numpy as np  # noqa: E402
+from PyQt5.QtGui import QGuiApplication, QPixmap  # noqa: E402
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from pydwmg.gui.maps import (  # noqa: E402
+    MAP_CACHE_DIR,
+    MAPS_DIR,
+    MapCache,
+    build_map_cache,
+    read_manifest,
+)
+from pydwmg.zones import load_zones  # noqa: E402
+
+MODES = {
+    "jpeg-pixmap": "QPixmap decoded from the JPEG, as before",
+    "cache-pixmap": "QPixmap converted from the mapped cache",
+    "cache-image": "QImage over the mapped cache, as the window loads it",
+    "cache-image-read": "QImage over the mapped cache, every pixel read",
+}
+
+
+def resident_bytes():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+def measure(args):
+    """Load every zone's map one way, printing timings and memory as JSON."""
+    app = QGuiApplication([])  # noqa: F841
+    map_filenames = [zone.map_filename for zone in load_zones()]
+    cache = MapCache(args.maps_dir, args.cache_dir)
+    mode = args.measure
+
+    def load(map_filename):
+        if mode == "jpeg-pixmap":
+            return QPixmap(os.path.join(args.maps_dir, map_filename))
+        if mode == "cache-pixmap":
+            return cache.pixmap(map_filename)
+        image = cache.image(map_filename)
+        if mode == "cache-image-read":
+            bits = image.constBits()
+            bits.setsize(image.sizeInBytes())
+            np.frombuffer(bits, dtype=np.uint8).sum()
+        return image
+
+    # Load one map first so plugin and cache setup is not counted as memory,
+    # then keep every map before timing reuses freed memory.
+    load(map_filenames[0])
+    before = resident_bytes()
+    kept = [load(map_filename) for map_filename in map_filenames]
+    after = resident_bytes()
+    times = []
+    for _ in range(args.repeat):
+        for map_filename in map_filenames:
+            start = time.perf_counter()
+            load(map_filename)
+            times.append(time.perf_counter() - start)
+    zero_copy = None
+    if mode.startswith("cache-image"):
+        # Every image should use a mapped file as its pixels.
+        mapped_addresses = {address for _, address in cache._mapped.values()}
+        zero_copy = all(int(image.constBits()) in mapped_addresses for image in kept)
+    print(
+        json.dumps(
+            {
+                "median_ms": statistics.median(times) * 1000,
+                "max_ms": max(times) * 1000,
+                "kb_per_zone": (after - before) / len(kept) / 1024,
+                "hits": cache.hits,
+                "misses": cache.misses,
+                "zero_copy": zero_copy,
+            }
+        )
+    )
+    return 0
+
+
+def main(args):
+    if args.measure:
+        return measure(args)
+    if not read_manifest(args.cache_dir)["maps"]:
+        start = time.perf_counter()
+        _, converted = build_map_cache(args.maps_dir, args.cache_dir)
+        print(f"built cache for {converted} maps in {time.perf_counter() - start:.2f}s")
+    print(f"{'mode':<18} {'median ms':>10} {'max ms':>8} {'RSS KB/zone':>12}")
+    for mode, description in MODES.items():
+        output = subprocess.run(
+            [
+                sys.executable,
+                __file__,
+                "--measure",
+                mode,
+                "--repeat",
+                str(args.repeat),
+                "--maps-dir",
+                args.maps_dir,
+                "--cache-dir",
+                args.cache_dir,
+            ],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        result = json.loads(output.splitlines()[-1])
+        print(
+            f"{mode:<18} {result['median_ms']:>10.3f} {result['max_ms']:>8.2f}"
+            f" {result['kb_per_zone']:>12.0f}  {description}"
+        )
+        if mode.startswith("cache") and result["misses"]:
+            print(f"  {result['misses']} loads missed the cache")
+        if result["zero_copy"] is False:
+            print("  images do not point into the mapped cache files")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--maps-dir", default=MAPS_DIR)
+    parser.add_argument("--cache-dir", default=MAP_CACHE_DIR)
+    parser.add_argument("--repeat", type=int, default=3, help="loads of each map")
+    parser.add_argument("--measure", choices=MODES, help=argparse.SUPPRESS)
+    sys.exit(main(parser.parse_args()))
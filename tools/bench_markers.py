@@ -0,0 +1,101 @@
+"""Micro-benchmark of marker rendering, per-draw trig against cached glyphs.
+
+Draws the same set of arrow and circle markers onto an offscreen image
+twice: once the way the map used to (rotating arrow points with trig and
+allocating a QPen for every draw) and once by stamping the cached glyphs
+from pydwmg.gui.markers.
+
+Run from the repository root:
+    python tools/bench_markers.py --markers 10000
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtCore import Qt  # noqa: E402
+from PyQt5.QtGui import QGuiApplication, QImage, QPainter, QPen  # noqa: E402
+
+from pydwmg.geometry import arrow_lines, heading_vector  # noqa: E402
+from pydwmg.gui.markers import draw_arrow_marker, draw_circle_marker  # noqa: E402
+
+CIRCLE_SIZE = 11
+ARROW_SIZE = 9
+
+
+def draw_trig(painter, moves):
+    """Old map drawing, trig and new pens for every marker."""
+    for start, end in moves:
+        arrow_head, cross = arrow_lines(start, end, ARROW_SIZE)
+        painter.setPen(QPen(Qt.red, 2))
+        for line in cross:
+            painter.drawLine(*line)
+        painter.setPen(QPen(Qt.black, 2))
+        for line in arrow_head:
+            painter.drawLine(*line)
+        x, y = start
+        painter.setPen(QPen(Qt.red, 2))
+        painter.drawEllipse(
+            round(x - CIRCLE_SIZE / 2),
+            round(y - CIRCLE_SIZE / 2),
+            CIRCLE_SIZE,
+            CIRCLE_SIZE,
+        )
+
+
+def draw_cached(painter, moves):
+    """Cached glyphs stamped with a transform from the heading vector."""
+    for start, end in moves:
+        heading = heading_vector(start, end)
+        if heading is not None:
+            draw_arrow_marker(painter, end, heading, ARROW_SIZE)
+        draw_circle_marker(painter, start, CIRCLE_SIZE)
+
+
+def bench(draw, moves, image, repeat):
+    best = None
+    for _ in range(repeat):
+        image.fill(Qt.white)
+        painter = QPainter(image)
+        start = time.perf_counter()
+        draw(painter, moves)
+        elapsed = time.perf_counter() - start
+        painter.end()
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main(args):
+    app = QGuiApplication([])  # noqa: F841 - needed for painting
+    rng = random.Random(1)
+    moves = [
+        (
+            (rng.uniform(0, args.size), rng.uniform(0, args.size)),
+            (rng.uniform(0, args.size), rng.uniform(0, args.size)),
+        )
+        for _ in range(args.markers)
+    ]
+    image = QImage(args.size, args.size, QImage.Format_RGB32)
+    trig = bench(draw_trig, moves, image, args.repeat)
+    cached = bench(draw_cached, moves, image, args.repeat)
+    print(f"{args.markers} arrow + circle markers, best of {args.repeat}")
+    print(f"per-draw trig:  {trig * 1e3:8.1f} ms ({trig / args.markers * 1e6:.1f} us)")
+    print(
+        f"cached glyphs:  {cached * 1e3:8.1f} ms ({cached / args.markers * 1e6:.1f} us)"
+    )
+    print(f"speedup: {trig / cached:.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--markers", type=int, default=10_000)
+    parser.add_argument("--size", type=int, default=800, help="image size in pixels")
+    parser.add_argument("--repeat", type=int, default=5)
+    main(parser.parse_args())
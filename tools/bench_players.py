@@ -0,0 +1,108 @@
+"""Benchmark of the shared map with many synthetic player feeds.
+
+Moves a fraction of 100 synthetic players every frame, then measures the
+cost of refreshing their map geometry through the PlayerTracker and of
+painting every marker in one batch onto the zone map.
+
+Run from the repository root:
+    python tools/bench_players.py --feeds 100 --frames 500
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from pydwmg.players import PlayerTracker  # noqa: E402
+from pydwmg.zones import find_zone, load_zones  # noqa: E402
+
+ZONE_NAME = "Qeynos Hills"
+
+
+def synthetic_frames(feeds, frames, moving, seed=1):
+    """Return per-frame lists of (name, loc) updates for a random walk."""
+    rng = random.Random(seed)
+    locs = {
+        f"player{i}": [rng.uniform(-2000, 2000), rng.uniform(-2000, 2000)]
+        for i in range(feeds)
+    }
+    names = list(locs)
+    updates = []
+    for _ in range(frames):
+        frame = []
+        for name in rng.sample(names, max(1, int(feeds * moving))):
+            loc = locs[name]
+            loc[0] += rng.uniform(-20, 20)
+            loc[1] += rng.uniform(-20, 20)
+            frame.append((name, (loc[0], loc[1], 0.0)))
+        updates.append(frame)
+    return names, updates
+
+
+def bench_tracker(zone, names, updates, width, height):
+    tracker = PlayerTracker([zone])
+    for name in names:
+        tracker.update_zone(name, zone.zone_name)
+    start = time.perf_counter()
+    for frame in updates:
+        for name, loc in frame:
+            tracker.update_loc(name, loc)
+        tracker.markers(zone, width, height)
+    return tracker, time.perf_counter() - start
+
+
+def bench_paint(tracker, zone, updates, map_base):
+    from PyQt5.QtGui import QPainter, QPixmap
+
+    from pydwmg.gui.overlay import paint_markers
+
+    start = time.perf_counter()
+    for frame in updates:
+        for name, loc in frame:
+            tracker.update_loc(name, loc)
+        frame_map = QPixmap(map_base)
+        painter = QPainter(frame_map)
+        paint_markers(
+            painter, tracker.markers(zone, map_base.width(), map_base.height())
+        )
+        painter.end()
+    return time.perf_counter() - start
+
+
+def main(args):
+    zone = find_zone(load_zones(), ZONE_NAME)
+    names, updates = synthetic_frames(args.feeds, args.frames, args.moving)
+    width, height = 600, 600
+    tracker, elapsed = bench_tracker(zone, names, updates, width, height)
+    per_frame = elapsed / args.frames * 1e6
+    print(f"{args.feeds} feeds, {args.moving:.0%} moving per frame")
+    print(f"tracker update + geometry: {per_frame:.1f} us/frame")
+
+    if args.no_paint:
+        return
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt5.QtGui import QGuiApplication, QPixmap
+
+    app = QGuiApplication([])  # noqa: F841 - needed for QPixmap
+    map_base = QPixmap(os.path.join("maps", zone.map_filename))
+    elapsed = bench_paint(tracker, zone, updates, map_base)
+    per_frame = elapsed / args.frames * 1e3
+    print(f"map copy + batched overlay paint: {per_frame:.2f} ms/frame")
+    print(f"max frame rate: {1e3 / per_frame:.0f} fps")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--feeds", type=int, default=100)
+    parser.add_argument("--frames", type=int, default=500)
+    parser.add_argument(
+        "--moving", type=float, default=0.2, help="fraction of feeds moved per frame"
+    )
+    parser.add_argument(
+        "--no-paint", action="store_true", help="skip the Qt painting benchmark"
+    )
+    main(parser.parse_args())
@@ -0,0 +1,108 @@
+"""Benchmark of the POI spatial index against a brute force NumPy scan.
+
+Indexes 100k random points spread over a zone, then times k nearest and
+radius queries, and moving entities in place. Every query result is
+checked against a brute force scan of all points, which is also timed.
+Nearest queries are also timed for a few points far apart, as a zone's
+zone lines or guild members are.
+
+Run from the repository root:
+    python tools/bench_poi.py --points 100000
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from pydwmg.poi import SpatialIndex  # noqa: E402
+
+# Roughly the extent of a large outdoor zone.
+ZONE_SPAN = 12000
+
+
+def timed(label, count, func, *args):
+    start = time.perf_counter()
+    results = [func(*query) for query in zip(*args)]
+    elapsed = time.perf_counter() - start
+    print(f"{label}: {elapsed / count * 1e6:.1f} us each, {count / elapsed:,.0f}/s")
+    return results
+
+
+def main(args):
+    rng = np.random.default_rng(1)
+    xs = rng.uniform(-ZONE_SPAN / 2, ZONE_SPAN / 2, args.points)
+    ys = rng.uniform(-ZONE_SPAN / 2, ZONE_SPAN / 2, args.points)
+    query_xs = rng.uniform(-ZONE_SPAN / 2, ZONE_SPAN / 2, args.queries).tolist()
+    query_ys = rng.uniform(-ZONE_SPAN / 2, ZONE_SPAN / 2, args.queries).tolist()
+    ks = [args.k] * args.queries
+    radii = [args.radius] * args.queries
+
+    index = SpatialIndex(args.cell_size)
+    start = time.perf_counter()
+    index.insert_many(list(range(args.points)), xs, ys)
+    print(f"indexed {args.points:,} points in {time.perf_counter() - start:.3f}s")
+
+    nearest_1 = timed("nearest k=1", args.queries, index.nearest, query_xs, query_ys)
+    nearest_k = timed(
+        f"nearest k={args.k}", args.queries, index.nearest, query_xs, query_ys, ks
+    )
+    within = timed(
+        f"within r={args.radius:g}",
+        args.queries,
+        index.within,
+        query_xs,
+        query_ys,
+        radii,
+    )
+
+    def brute_nearest(x, y, k):
+        distances = np.hypot(xs - x, ys - y)
+        nearest = np.argpartition(distances, k - 1)[:k]
+        return np.sort(distances[nearest])
+
+    brute = timed(
+        f"brute force k={args.k}",
+        args.queries,
+        brute_nearest,
+        query_xs,
+        query_ys,
+        ks,
+    )
+    for x, y, found_1, found_k, found_within, expected in zip(
+        query_xs, query_ys, nearest_1, nearest_k, within, brute
+    ):
+        assert np.isclose(found_1[0][0], expected[0])
+        assert np.allclose([distance for distance, _ in found_k], expected)
+        inside = np.count_nonzero(np.hypot(xs - x, ys - y) <= args.radius)
+        assert len(found_within) == inside
+    print("all query results match brute force")
+
+    # Move a subset of points a short step, as a feed of players would.
+    movers = rng.integers(0, args.points, args.moves).tolist()
+    steps = rng.normal(0, 20, size=(args.moves, 2))
+    new_xs = (xs[movers] + steps[:, 0]).tolist()
+    new_ys = (ys[movers] + steps[:, 1]).tolist()
+    timed("move", args.moves, index.move, movers, new_xs, new_ys)
+
+    sparse = SpatialIndex(args.cell_size)
+    sparse.insert_many(["west", "east"], [-ZONE_SPAN / 2] * 2, [0, ZONE_SPAN / 2])
+    # A point that wandered far off and back must not widen the search.
+    sparse.insert("wanderer", 5 * ZONE_SPAN, 5 * ZONE_SPAN)
+    sparse.move("wanderer", 0, 0)
+    timed("sparse nearest k=1", args.queries, sparse.nearest, query_xs, query_ys)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--points", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=2_000)
+    parser.add_argument("--moves", type=int, default=100_000)
+    parser.add_argument("-k", type=int, default=10)
+    parser.add_argument("--radius", type=float, default=250.0)
+    parser.add_argument("--cell-size", type=float, default=100.0)
+    main(parser.parse_args())
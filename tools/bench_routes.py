@@ -0,0 +1,149 @@
+"""Benchmark of route planning over a generated world sized zone graph.
+
+Builds a grid of zones joined by zone lines at random locs, then times
+route queries to random target zones and players. Cold queries build the
+cost tables for their target zone, warm queries reuse them from a new
+start position. Routes are checked against a plain forward Dijkstra
+search, and the shipped zone_lines.csv graph is timed as well.
+
+Run from the repository root:
+    python tools/bench_routes.py --zones 400
+"""
+
+import argparse
+import heapq
+import math
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from pydwmg.routes import (  # noqa: E402
+    ZONE_LINE_COST,
+    RoutePlanner,
+    ZoneGraph,
+    ZoneLine,
+    leg_cost,
+    load_zone_graph,
+)
+
+ZONE_SPAN = 8000
+
+
+def world_graph(zones, rng):
+    """Return a ZoneGraph of a square grid of zones with a few shortcuts."""
+    side = math.ceil(math.sqrt(zones))
+    names = [f"Zone {n}" for n in range(zones)]
+    links = set()
+    for n in range(zones):
+        if n % side + 1 < side and n + 1 < zones:
+            links.add((n, n + 1))
+        if n + side < zones:
+            links.add((n, n + side))
+    # Boats and portals between distant zones.
+    for _ in range(zones // 10):
+        links.add(tuple(sorted(rng.sample(range(zones), 2))))
+
+    def loc():
+        if rng.random() < 0.1:
+            return None, None
+        return (rng.uniform(-ZONE_SPAN, ZONE_SPAN), rng.uniform(-ZONE_SPAN, ZONE_SPAN))
+
+    zone_lines = []
+    for a, b in links:
+        zone_lines.append(ZoneLine(names[a], names[b], *loc()))
+        zone_lines.append(ZoneLine(names[b], names[a], *loc()))
+    return ZoneGraph(zone_lines), names
+
+
+def forward_cost(graph, zone_name, start, target_zone_name, target):
+    """Return the cheapest route cost by searching forwards from the start."""
+    if zone_name == target_zone_name:
+        return 0.0 if target is None else leg_cost(start, target)
+    costs = {}
+    queue = []
+    for index in graph.exits.get(zone_name, ()):
+        costs[index] = leg_cost(start, graph.points[index]) + ZONE_LINE_COST
+        heapq.heappush(queue, (costs[index], index))
+    best = math.inf
+    while queue:
+        cost, index = heapq.heappop(queue)
+        if cost > costs[index] or cost >= best:
+            continue
+        arrival = graph.arrivals[index]
+        to_zone_name = graph.zone_lines[index].to_zone_name
+        if to_zone_name == target_zone_name:
+            best = min(
+                best, cost + (0.0 if target is None else leg_cost(arrival, target))
+            )
+            continue
+        for following in graph.exits.get(to_zone_name, ()):
+            new_cost = (
+                cost + leg_cost(arrival, graph.points[following]) + ZONE_LINE_COST
+            )
+            if new_cost < costs.get(following, math.inf):
+                costs[following] = new_cost
+                heapq.heappush(queue, (new_cost, following))
+    return None if best == math.inf else best
+
+
+def random_loc(rng):
+    return (rng.uniform(-ZONE_SPAN, ZONE_SPAN), rng.uniform(-ZONE_SPAN, ZONE_SPAN), 0.0)
+
+
+def bench(label, graph, names, args, rng):
+    queries = []
+    for _ in range(args.queries):
+        target_loc = random_loc(rng) if rng.random() < 0.5 else None
+        queries.append(
+            (rng.choice(names), random_loc(rng), rng.choice(names), target_loc)
+        )
+
+    planner = RoutePlanner(graph, cache_size=len(names))
+    start = time.perf_counter()
+    routes = [planner.route(*query) for query in queries]
+    cold = time.perf_counter() - start
+    # Same targets from new positions, as when walking towards a target.
+    moved = [
+        (zone, random_loc(rng), target, target_loc)
+        for zone, _, target, target_loc in queries
+    ]
+    start = time.perf_counter()
+    for query in moved:
+        planner.route(*query)
+    warm = time.perf_counter() - start
+
+    print(f"{label}: {len(graph.zone_lines):,} zone lines in {len(names):,} zones")
+    print(
+        f"  cold: {args.queries / cold:,.0f} queries/s"
+        f" ({planner.misses:,} tables built)"
+    )
+    print(f"  warm: {args.queries / warm:,.0f} queries/s")
+
+    for (zone, loc, target, target_loc), route in zip(queries[: args.check], routes):
+        expected = forward_cost(
+            graph, zone, loc[:2], target, target_loc and target_loc[:2]
+        )
+        if expected is None:
+            assert route is None
+        else:
+            assert math.isclose(route.cost, expected), (route.cost, expected)
+    print(f"  {min(args.check, args.queries)} routes match forward search")
+
+
+def main(args):
+    rng = random.Random(1)
+    graph, names = world_graph(args.zones, rng)
+    bench("generated world", graph, names, args, rng)
+    graph = load_zone_graph()
+    bench("zone_lines.csv", graph, graph.zone_names(), args, rng)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--zones", type=int, default=400)
+    parser.add_argument("--queries", type=int, default=5_000)
+    parser.add_argument("--check", type=int, default=500)
+    main(parser.parse_args())
@@ -0,0 +1,97 @@
+"""Benchmark of logging and span tracing overhead, disabled and enabled.
+
+Times a disabled debug log statement, spans and traced calls with tracing
+off and on, and the cost of an enabled log record reaching the queue, so
+instrumentation can be left in hot paths.
+
+Run from the repository root:
+    python tools/bench_tracing.py --calls 1000000
+"""
+
+import argparse
+import io
+import logging
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from pydwmg.tracing import (  # noqa: E402
+    LOGGER_NAME,
+    setup_logging,
+    stop_logging,
+    traced,
+    tracer,
+)
+
+logger = logging.getLogger(f"{LOGGER_NAME}.bench")
+
+
+@traced("bench")
+def traced_call():
+    pass
+
+
+def plain_call():
+    pass
+
+
+def per_call(label, calls, func):
+    start = time.perf_counter()
+    func(calls)
+    elapsed = time.perf_counter() - start
+    print(f"{label}: {elapsed / calls * 1e9:.0f} ns")
+
+
+def log_debug(calls):
+    for n in range(calls):
+        logger.debug("line %d", n)
+
+
+def log_info(calls):
+    for n in range(calls):
+        logger.info("line %d", n)
+
+
+def spans(calls):
+    for _ in range(calls):
+        with tracer.span("bench"):
+            pass
+
+
+def traced_calls(calls):
+    for _ in range(calls):
+        traced_call()
+
+
+def plain_calls(calls):
+    for _ in range(calls):
+        plain_call()
+
+
+def empty_loop(calls):
+    for _ in range(calls):
+        pass
+
+
+def main(args):
+    setup_logging(logging.INFO, stream=io.StringIO())
+    per_call("empty loop", args.calls, empty_loop)
+    per_call("disabled debug log", args.calls, log_debug)
+    per_call("disabled span", args.calls, spans)
+    per_call("plain call", args.calls, plain_calls)
+    per_call("traced call, tracing off", args.calls, traced_calls)
+    tracer.enable()
+    per_call("enabled span", args.calls, spans)
+    per_call("traced call, tracing on", args.calls, traced_calls)
+    tracer.disable()
+    tracer.clear()
+    per_call("enabled info log (queued)", args.calls // 10, log_info)
+    stop_logging()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=1_000_000)
+    main(parser.parse_args())
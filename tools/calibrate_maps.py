@@ -0,0 +1,179 @@
+"""Calibrate zone map scale and offsets from loc to map pixel control points.
+
+Reads control point csv files (zone_name, loc_y, loc_x, map_x, map_y with
+locs as /loc prints them), fits the scale and offsets of every zone with
+points by least squares, and writes zone_info.csv with the new values.
+Zones without points, or whose fit fails validation, keep their current
+values. The written file is loaded back and checked against the control
+points before the run reports success.
+
+With --simulate, control points are generated for every zone from a
+slightly wrong copy of the current calibration, with pixel noise and
+misplaced clicks, to check the fit recovers it.
+
+Run from the repository root:
+    python tools/calibrate_maps.py points.csv --output zone_info.csv
+    python tools/calibrate_maps.py --simulate 200
+"""
+
+import argparse
+import copy
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from pydwmg.calibration import (  # noqa: E402
+    fit_zone,
+    read_control_points,
+    zone_residuals,
+)
+from pydwmg.zones import ZONE_INFO_FILE, load_zones, save_zones  # noqa: E402
+
+# Map pixel area simulated control points are spread over.
+SIMULATED_MAP_SIZE = 600
+
+
+def simulate_points(zones, count, noise, outliers, rng):
+    """Return control points and the calibration they were generated from."""
+    points = {}
+    truth = {}
+    for zone in zones:
+        scale = 1 / zone.map_scale_factor * rng.uniform(0.98, 1.02)
+        offset_x = zone.offset_x + rng.uniform(-5, 5)
+        offset_y = zone.offset_y + rng.uniform(-5, 5)
+        truth[zone.zone_name] = (scale, offset_x, offset_y)
+        pixels = rng.uniform(0, SIMULATED_MAP_SIZE, size=(count, 2))
+        locs = np.column_stack(
+            [(offset_x - pixels[:, 0]) / scale, (offset_y - pixels[:, 1]) / scale]
+        )
+        clicked = pixels + rng.normal(0, noise, size=pixels.shape)
+        misplaced = rng.random(count) < outliers
+        clicked[misplaced] += rng.uniform(-60, 60, size=(misplaced.sum(), 2))
+        points[zone.zone_name] = (locs, clicked)
+    return points, truth
+
+
+def main(args):
+    zones = load_zones(args.zone_info)
+    rng = np.random.default_rng(args.seed)
+    truth = None
+    if args.simulate:
+        points, truth = simulate_points(
+            zones, args.simulate, args.noise, args.outliers, rng
+        )
+    else:
+        points = read_control_points(args.points)
+    unknown = sorted(set(points) - {zone.zone_name for zone in zones})
+    for zone_name in unknown:
+        print(f"warning: control points for unknown zone {zone_name!r} ignored")
+
+    start = time.perf_counter()
+    calibrated = []
+    results = []
+    for zone in zones:
+        new_zone = copy.copy(zone)
+        calibrated.append(new_zone)
+        if zone.zone_name not in points:
+            continue
+        locs, pixels = points[zone.zone_name]
+        old_rms = float(np.sqrt(np.mean(zone_residuals(zone, locs, pixels) ** 2)))
+        fit = fit_zone(zone.zone_name, locs, pixels)
+        status = fit.error
+        if status is None and fit.rms > args.max_rms:
+            status = f"rms {fit.rms:.2f} px over --max-rms {args.max_rms:g}"
+        if status is None:
+            new_zone.map_grid_size = new_zone.eq_grid_size * fit.scale
+            new_zone.map_scale_factor = 1 / fit.scale
+            new_zone.offset_x = fit.offset_x
+            new_zone.offset_y = fit.offset_y
+        results.append((zone, fit, old_rms, status))
+    elapsed = time.perf_counter() - start
+
+    print(
+        f"{'zone':<28} {'points':>9} {'old rms':>8} {'rms':>6} {'max':>6}"
+        f" {'grid':>13} {'offset x':>15} {'offset y':>15}"
+    )
+    for zone, fit, old_rms, status in results:
+        if fit.scale is None:
+            print(f"{zone.zone_name:<28} {fit.points:>9} {old_rms:>8.2f}  {status}")
+            continue
+        grid = zone.eq_grid_size * fit.scale
+        print(
+            f"{zone.zone_name:<28} {fit.used:>4}/{fit.points:<4} {old_rms:>8.2f}"
+            f" {fit.rms:>6.2f} {fit.max_error:>6.2f}"
+            f" {zone.map_grid_size:>5g}>{grid:<7.2f}"
+            f" {zone.offset_x:>6.1f}>{fit.offset_x:<8.1f}"
+            f" {zone.offset_y:>6.1f}>{fit.offset_y:<8.1f}"
+            + ("" if status is None else f"  FAILED: {status}")
+        )
+    failed = [zone for zone, _, _, status in results if status is not None]
+    print(
+        f"fitted {len(results)} zones in {elapsed * 1000:.1f} ms,"
+        f" {len(failed)} failed and kept their current values"
+    )
+
+    if truth is not None:
+        worst = max(
+            abs(new_zone.offset_x - truth[new_zone.zone_name][1])
+            + abs(new_zone.offset_y - truth[new_zone.zone_name][2])
+            for new_zone in calibrated
+        )
+        print(f"simulated: worst offset error from the true calibration {worst:.2f} px")
+
+    output = args.zone_info if args.in_place else args.output
+    if output is None:
+        return 1 if failed else 0
+    save_zones(calibrated, output)
+    # Check the written file loads and reproduces the fitted residuals.
+    written = load_zones(output)
+    problems = []
+    if [zone.zone_name for zone in written] != [zone.zone_name for zone in zones]:
+        problems.append("zone names or order changed")
+    for zone in written:
+        if zone.zone_name in points and zone.map_scale_factor <= 0:
+            problems.append(f"{zone.zone_name}: scale is not positive")
+    for (zone, fit, _, status), written_zone in zip(
+        results, [find for find in written if find.zone_name in points]
+    ):
+        if status is not None:
+            continue
+        locs, pixels = points[zone.zone_name]
+        errors = zone_residuals(written_zone, locs, pixels)
+        # Written values are rounded, which may move points a little.
+        if np.sqrt(np.mean(np.sort(errors)[: fit.used] ** 2)) > fit.rms + 0.5:
+            problems.append(f"{zone.zone_name}: written values do not match the fit")
+    for problem in problems:
+        print(f"validation: {problem}")
+    print(f"wrote {output}" + (", FAILED validation" if problems else ", validated"))
+    return 1 if failed or problems else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("points", nargs="*", help="control point csv files")
+    parser.add_argument("--zone-info", default=ZONE_INFO_FILE)
+    output = parser.add_mutually_exclusive_group()
+    output.add_argument("--output", help="zone info csv to write")
+    output.add_argument("--in-place", action="store_true", help="overwrite --zone-info")
+    parser.add_argument(
+        "--max-rms",
+        type=float,
+        default=3.0,
+        help="largest rms pixel error accepted for a zone",
+    )
+    parser.add_argument(
+        "--simulate", type=int, metavar="N", help="generate N points per zone"
+    )
+    parser.add_argument("--noise", type=float, default=1.0, help="simulated px")
+    parser.add_argument(
+        "--outliers", type=float, default=0.05, help="simulated misplaced share"
+    )
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    if not args.points and not args.simulate:
+        parser.error("give control point files or --simulate")
+    sys.exit(main(args))
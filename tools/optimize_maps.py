@@ -0,0 +1,78 @@
+"""Build the pre-decoded map cache used by the map window.
+
+Decodes every map in maps/ with a pool of processes and writes their raw
+pixels at full size to map_cache/, see pydwmg.gui.maps. Downscaled variants
+are only written when asked for with --scales. Only maps whose contents
+changed since the last build are converted again.
+
+Run from the repository root:
+    python tools/optimize_maps.py
+    python tools/optimize_maps.py --indexed --processes 4
+    python tools/optimize_maps.py --scales 1 0.5 0.25
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from pydwmg.gui.maps import (  # noqa: E402
+    MAP_CACHE_DIR,
+    MAPS_DIR,
+    SCALES,
+    build_map_cache,
+)
+
+
+def main(args):
+    start = time.perf_counter()
+    manifest, converted = build_map_cache(
+        args.maps_dir,
+        args.cache_dir,
+        scales=args.scales,
+        indexed=args.indexed,
+        processes=args.processes,
+        force=args.force,
+    )
+    elapsed = time.perf_counter() - start
+    source_bytes = sum(entry["size"] for entry in manifest["maps"].values())
+    cache_bytes = sum(
+        os.path.getsize(os.path.join(args.cache_dir, variant["file"]))
+        for asset in manifest["assets"].values()
+        for variant in asset["variants"].values()
+    )
+    print(
+        f"converted {converted} of {len(manifest['maps'])} maps"
+        f" in {elapsed:.2f}s with {args.processes or os.cpu_count()} processes"
+    )
+    print(
+        f"  {source_bytes / 1e6:.1f} MB of maps, {cache_bytes / 1e6:.1f} MB"
+        f" cached in {args.cache_dir}"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--maps-dir", default=MAPS_DIR)
+    parser.add_argument("--cache-dir", default=MAP_CACHE_DIR)
+    parser.add_argument(
+        "--scales",
+        type=float,
+        nargs="+",
+        default=SCALES,
+        help="variant sizes relative to the original",
+    )
+    parser.add_argument(
+        "--indexed",
+        action="store_true",
+        help="store 256 colour palette indices instead of RGB, a third the size",
+    )
+    parser.add_argument("--processes", type=int, help="pool size, default cpu count")
+    parser.add_argument(
+        "--force", action="store_true", help="convert maps even if unchanged"
+    )
+    sys.exit(main(parser.parse_args()))
@@ -0,0 +1,100 @@
+"""Load test for the headless tracking service.
+
+Starts a TrackingService on a local port, connects a number of subscriber
+clients (some of them deliberately slow readers) and publishes synthetic
+zone and loc events from many sources as fast as possible. Reports the
+publish rate, the fan-out rate delivered to clients and how many stale loc
+frames were dropped for slow clients.
+
+Run from the repository root:
+    python tools/service_loadtest.py --clients 50 --sources 20 --seconds 5
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from pydwmg.events import LOC, ZONE  # noqa: E402
+from pydwmg.service import TrackingService  # noqa: E402
+
+
+async def client(host, port, slow, counts, index):
+    reader, writer = await asyncio.open_connection(host, port, limit=2 ** 20)
+    received = 0
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            json.loads(line)
+            received += 1
+            if slow and received % 100 == 0:
+                # Slow readers stall so the service has to apply backpressure.
+                await asyncio.sleep(0.01)
+    except (ConnectionError, asyncio.CancelledError):
+        pass
+    finally:
+        counts[index] = received
+        writer.close()
+
+
+async def publisher(service, sources, seconds):
+    published = 0
+    deadline = time.perf_counter() + seconds
+    for src in range(sources):
+        service.publish(f"player{src}", ZONE, "Qeynos Hills")
+    step = 0
+    while time.perf_counter() < deadline:
+        for _ in range(100):
+            src = step % sources
+            service.publish(f"player{src}", LOC, (step % 1000 * 1.0, 5.0, 0.0))
+            step += 1
+        published += 100
+        # Yield so the subscriber writers get a chance to run.
+        await asyncio.sleep(0)
+    return published + sources
+
+
+async def main(args):
+    service = TrackingService(max_queue=args.max_queue)
+    (host, port, *_), *_ = await service.start("127.0.0.1", 0)
+    counts = [0] * args.clients
+    tasks = [
+        asyncio.create_task(client(host, port, i < args.slow, counts, i))
+        for i in range(args.clients)
+    ]
+    while len(service.subscribers) < args.clients:
+        await asyncio.sleep(0.01)
+
+    start = time.perf_counter()
+    published = await publisher(service, args.sources, args.seconds)
+    # Let the writers flush what is left.
+    await asyncio.sleep(0.5)
+    elapsed = time.perf_counter() - start
+    dropped = sum(s.locs_dropped for s in service.subscribers)
+    await service.stop()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+    delivered = sum(counts)
+    print(f"clients: {args.clients} ({args.slow} slow), sources: {args.sources}")
+    print(f"published: {published} events, {published / elapsed:,.0f}/s")
+    print(f"delivered: {delivered} frames, {delivered / elapsed:,.0f}/s fan-out")
+    print(f"stale locs coalesced across all clients: {dropped}")
+    fast = counts[args.slow :]
+    if fast:
+        print(f"frames per fast client: min {min(fast)}, max {max(fast)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--slow", type=int, default=5, help="number of slow clients")
+    parser.add_argument("--sources", type=int, default=20)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--max-queue", type=int, default=1000)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,101 @@
+"""Simulation of adaptive log polling against the old fixed 100 ms poll.
+
+Plays a session with a simulated clock: the game writes a line every
+half second, goes quiet for a while, then writes again. Prints wakeups
+per minute for the log parser and folder scanner schedules, and how long
+the first line after the quiet spell waited to be read.
+
+Run from the repository root:
+    python tools/sim_polling.py --quiet 900
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from pydwmg.gui.workers import (  # noqa: E402
+    POLL_INTERVAL,
+    POLL_MAX_INTERVAL,
+    SCAN_INTERVAL,
+    SCAN_MAX_INTERVAL,
+)
+from pydwmg.polling import PollSchedule  # noqa: E402
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def simulate(schedule, clock, line_times, end):
+    """Poll until end, returning wakeups per minute and each line's read delay."""
+    per_minute = {}
+    delays = []
+    pending = iter(line_times)
+    next_line = next(pending, None)
+    minute = 0
+    minute_start_wakeups = 0
+    while clock.now < end:
+        if clock.now >= (minute + 1) * 60:
+            per_minute[minute] = schedule.wakeups - minute_start_wakeups
+            minute_start_wakeups = schedule.wakeups
+            minute = int(clock.now // 60)
+        if next_line is not None and next_line <= clock.now:
+            while next_line is not None and next_line <= clock.now:
+                delays.append(clock.now - next_line)
+                next_line = next(pending, None)
+            schedule.activity()
+            continue
+        clock.now += schedule.next_interval()
+    return per_minute, delays
+
+
+def main(args):
+    active = args.active
+    quiet_end = active + args.quiet
+    end = quiet_end + active
+    line_times = [t * 0.5 for t in range(int(active * 2))]
+    line_times += [quiet_end + t * 0.5 for t in range(int(active * 2))]
+
+    schedules = {
+        "fixed parser": lambda clock: PollSchedule(
+            0.1, 0.1, idle_interval=0.1, clock=clock
+        ),
+        "adaptive parser": lambda clock: PollSchedule(
+            POLL_INTERVAL, POLL_MAX_INTERVAL, clock=clock
+        ),
+        "fixed scanner": lambda clock: PollSchedule(
+            0.1, 0.1, idle_interval=0.1, clock=clock
+        ),
+        "adaptive scanner": lambda clock: PollSchedule(
+            SCAN_INTERVAL, SCAN_MAX_INTERVAL, clock=clock
+        ),
+    }
+    print(f"{active:.0f}s active, {args.quiet:.0f}s quiet, {active:.0f}s active")
+    for label, make in schedules.items():
+        clock = Clock()
+        schedule = make(clock)
+        per_minute, delays = simulate(schedule, clock, line_times, end)
+        quiet_minutes = [
+            per_minute.get(minute, 0)
+            for minute in range(int(active // 60) + 5, int(quiet_end // 60))
+        ]
+        idle_rate = min(quiet_minutes) if quiet_minutes else 0
+        print(
+            f"{label:>16}: {schedule.wakeups / (end / 60):7.1f} wakeups/min"
+            f" average, {idle_rate:4d}/min when idle,"
+            f" first line after quiet read in {delays[len(delays) // 2]:.2f}s"
+            f" (at most {max(schedule.idle_interval, schedule.max_interval):g}s)"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--active", type=float, default=120.0)
+    parser.add_argument("--quiet", type=float, default=900.0)
+    main(parser.parse_args())
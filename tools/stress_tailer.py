@@ -0,0 +1,134 @@
+"""Stress test for LogTailer under rotation, truncation and partial writes.
+
+A writer thread appends numbered lines as fast as it can, splitting some
+of them across two writes and making some of them very long, while it
+periodically rotates the log (rename and recreate) and truncates it in
+place. The tailer follows the log in the main thread and every received
+line is checked to be complete and in order. Lines can only be lost when
+a truncation removes them before the tailer has read them, so with
+--no-truncate the run fails if any line is missing.
+
+Run from the repository root:
+    python tools/stress_tailer.py --lines 200000 --rotate-every 5000
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from pydwmg.logfile import LogTailer  # noqa: E402
+
+HEADER = "[Mon Jan 11 22:11:53 2021] "
+
+
+def make_line(seq, rng, long_every):
+    """Return a line whose body length can be checked from the line itself."""
+    size = rng.randrange(200_000) if seq % long_every == 0 else rng.randrange(80)
+    return f"{HEADER}seq {seq} {size} {'x' * size} end\n"
+
+
+def check_line(line):
+    """Return the sequence number of a line, raising ValueError if malformed."""
+    if not line.startswith(HEADER) or not line.endswith(" end"):
+        raise ValueError(f"malformed line: {line[:60]!r}")
+    _, seq, size, body, _ = line[len(HEADER) :].split(" ")
+    if len(body) != int(size):
+        raise ValueError(f"line {seq} has {len(body)} body bytes, expected {size}")
+    return int(seq)
+
+
+def writer(path, args, done):
+    rng = random.Random(args.seed)
+    log = open(path, "a", buffering=1)
+    try:
+        for seq in range(args.lines):
+            line = make_line(seq, rng, args.long_every)
+            if rng.random() < args.partial_rate:
+                # Write half a line and let the tailer see it first.
+                split = rng.randrange(len(line))
+                log.write(line[:split])
+                log.flush()
+                log.write(line[split:])
+            else:
+                log.write(line)
+            if args.rotate_every and seq % args.rotate_every == args.rotate_every - 1:
+                log.close()
+                os.replace(path, f"{path}.1")
+                log = open(path, "a", buffering=1)
+            elif (
+                args.truncate_every
+                and seq % args.truncate_every == args.truncate_every - 1
+            ):
+                log.flush()
+                os.truncate(path, 0)
+    finally:
+        log.close()
+        done.set()
+
+
+def main(args):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "eqlog_Stress_test.txt")
+        open(path, "w").close()
+        done = threading.Event()
+        tailer = LogTailer(path)
+        tailer.open()
+        thread = threading.Thread(target=writer, args=(path, args, done))
+        start = time.perf_counter()
+        thread.start()
+
+        received = malformed = out_of_order = 0
+        last_seq = -1
+        idle_after_done = 0
+        while idle_after_done < 3:
+            lines = tailer.readlines()
+            if not lines:
+                if done.is_set():
+                    idle_after_done += 1
+                time.sleep(0.001)
+                continue
+            idle_after_done = 0
+            for line in lines:
+                try:
+                    seq = check_line(line)
+                except ValueError as e:
+                    malformed += 1
+                    print(e)
+                    continue
+                if seq <= last_seq:
+                    out_of_order += 1
+                last_seq = seq
+                received += 1
+        elapsed = time.perf_counter() - start
+        thread.join()
+        tailer.close()
+
+    lost = args.lines - received
+    print(f"lines written: {args.lines}, received: {received} in {elapsed:.2f}s")
+    print(f"throughput: {received / elapsed:,.0f} lines/s")
+    print(f"rotations seen: {tailer.rotations}, truncations seen: {tailer.truncations}")
+    print(f"malformed: {malformed}, out of order: {out_of_order}, lost: {lost}")
+    failed = malformed or out_of_order or (lost and not args.truncate_every)
+    print("FAILED" if failed else "OK")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lines", type=int, default=200_000)
+    parser.add_argument("--rotate-every", type=int, default=5_000)
+    parser.add_argument("--truncate-every", type=int, default=7_000)
+    parser.add_argument(
+        "--no-truncate", dest="truncate_every", action="store_const", const=0
+    )
+    parser.add_argument("--long-every", type=int, default=1_000)
+    parser.add_argument("--partial-rate", type=float, default=0.05)
+    parser.add_argument("--seed", type=int, default=1)
+    sys.exit(main(parser.parse_args()))
@@ -0,0 +1,159 @@
+"""Stress test for worker lifecycle, switching the followed log many times.
+
+A writer thread keeps appending locs to a set of logs while the log
+parser, which starts by sending the log's current zone, is switched
+between them through a WorkerSupervisor, as the log
+scanner does when another character logs in. Each switch must stop and
+join the old parser before the new one starts, so at most one parser ever
+runs, no events arrive from a replaced parser, and once everything is
+stopped no threads are left behind.
+
+Run from the repository root:
+    python tools/stress_workers.py --switches 1000
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from PyQt5.QtCore import QCoreApplication, QThreadPool
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from pydwmg.gui.supervisor import WorkerSupervisor  # noqa: E402
+from pydwmg.gui.workers import EQLogParser  # noqa: E402
+
+HEADER = "[Mon Jan 11 22:11:53 2021] "
+
+
+def thread_count():
+    """Return the number of OS threads in this process."""
+    try:
+        return len(os.listdir("/proc/self/task"))
+    except OSError:
+        return threading.active_count()
+
+
+class CountingParser(EQLogParser):
+    """EQLogParser that tracks how many parsers are running at once."""
+
+    lock = threading.Lock()
+    running = 0
+    most_running = 0
+
+    def work(self):
+        cls = CountingParser
+        with cls.lock:
+            cls.running += 1
+            cls.most_running = max(cls.most_running, cls.running)
+        try:
+            super(CountingParser, self).work()
+        finally:
+            with cls.lock:
+                cls.running -= 1
+
+
+def writer(paths, done):
+    n = 0
+    while not done.is_set():
+        for path in paths:
+            with open(path, "a") as f:
+                f.write(f"{HEADER}Your Location is {n}.00, {n}.00, 1.00\n")
+        n += 1
+        time.sleep(0.001)
+
+
+def main(args):
+    app = QCoreApplication([])
+    threadpool = QThreadPool()
+    # Let idle pool threads exit quickly so leaks are visible at the end.
+    threadpool.setExpiryTimeout(100)
+    baseline = thread_count()
+    supervisor = WorkerSupervisor(threadpool)
+    current = [None]
+    stale = [0]
+    received = [0]
+
+    def on_event(worker):
+        def slot(*args):
+            received[0] += 1
+            if worker is not current[0]:
+                stale[0] += 1
+
+        return slot
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        paths = []
+        for n in range(args.logs):
+            path = os.path.join(tmp_dir, f"eqlog_Stress{n}_test.txt")
+            with open(path, "w") as f:
+                f.write(f"{HEADER}You have entered Qeynos Hills.\n")
+            paths.append(path)
+        done = threading.Event()
+        writer_thread = threading.Thread(target=writer, args=(paths, done))
+        writer_thread.start()
+        # The writer is running, so it no longer counts as a leak.
+        baseline += 1
+
+        overlaps = 0
+        switch_times = []
+        start = time.perf_counter()
+        for switch in range(args.switches):
+            previous = current[0]
+            worker = CountingParser(paths[switch % args.logs])
+            worker.signals.zone.connect(on_event(worker))
+            worker.signals.loc.connect(on_event(worker))
+            current[0] = worker
+            supervisor.start("parser", worker)
+            if previous is not None:
+                if not previous.join(0):
+                    overlaps += 1
+                switch_times.append(supervisor.exit_times["parser"] * 1000)
+            deadline = time.perf_counter() + args.dwell
+            while time.perf_counter() < deadline:
+                app.processEvents()
+        supervisor.stop_all()
+        elapsed = time.perf_counter() - start
+        app.processEvents()
+        done.set()
+        writer_thread.join()
+        baseline -= 1
+
+    threadpool.waitForDone(5000)
+    time.sleep(0.5)
+    leaked = thread_count() - baseline
+    print(f"{args.switches} switches between {args.logs} logs in {elapsed:.2f}s")
+    print(f"events received: {received[0]}, from replaced parsers: {stale[0]}")
+    print(
+        f"most parsers running at once: {CountingParser.most_running},"
+        f" still running after switch: {overlaps}"
+    )
+    print(f"stragglers: {len(supervisor.stragglers)}, leaked threads: {leaked}")
+    print(
+        f"parser exit after stop: median {statistics.median(switch_times):.2f} ms,"
+        f" max {max(switch_times):.2f} ms"
+    )
+    failed = (
+        stale[0]
+        or overlaps
+        or CountingParser.most_running > 1
+        or supervisor.stragglers
+        or leaked > 0
+    )
+    print("FAILED" if failed else "OK")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--switches", type=int, default=1000)
+    parser.add_argument("--logs", type=int, default=4)
+    parser.add_argument(
+        "--dwell", type=float, default=0.005, help="seconds to follow each log"
+    )
+    sys.exit(main(parser.parse_args()))